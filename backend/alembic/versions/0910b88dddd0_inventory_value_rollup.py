@@ -0,0 +1,37 @@
+"""inventory value rollup
+
+Revision ID: 0910b88dddd0
+Revises: 214bec158d8d
+Create Date: 2026-10-15 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0910b88dddd0'
+down_revision = '214bec158d8d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Without inventory_items the view is created with the table instead
+    # (see the after_create DDL in app.models.inventory)
+    op.execute(
+        "DO $$ BEGIN IF to_regclass('inventory_items') IS NOT NULL THEN "
+        "CREATE MATERIALIZED VIEW IF NOT EXISTS inventory_value_by_category AS "
+        "SELECT category, "
+        "SUM(quantity_in_stock * COALESCE(cost_price, unit_price)) AS value, "
+        "COUNT(*) AS item_count "
+        "FROM inventory_items GROUP BY category; "
+        # REFRESH ... CONCURRENTLY needs a unique index on the view
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_inventory_value_by_category_category "
+        "ON inventory_value_by_category (category); "
+        "END IF; END $$"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS inventory_value_by_category")
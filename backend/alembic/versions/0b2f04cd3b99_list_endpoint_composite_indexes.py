@@ -0,0 +1,42 @@
+"""list endpoint composite indexes
+
+Revision ID: 0b2f04cd3b99
+Revises: 9c0776776def
+Create Date: 2026-10-15 14:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b2f04cd3b99'
+down_revision = '9c0776776def'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns) matching the list endpoints' filters and sort order
+COMPOSITE_INDEXES = [
+    ("ix_inventory_items_category_name", "inventory_items", ["category", "name"]),
+    ("ix_orders_status_order_date", "orders", ["status", sa.text("order_date DESC")]),
+    ("ix_orders_order_type_order_date", "orders", ["order_type", sa.text("order_date DESC")]),
+]
+
+
+def _has_table(name: str) -> bool:
+    bind = op.get_bind()
+    return bind.execute(sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+
+
+def upgrade() -> None:
+    # Tables not created yet get the indexes with them (create_all)
+    indexes = [index for index in COMPOSITE_INDEXES if _has_table(index[1])]
+    with op.get_context().autocommit_block():
+        for name, table, columns in indexes:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in COMPOSITE_INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
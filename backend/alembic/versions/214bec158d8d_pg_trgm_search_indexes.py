@@ -0,0 +1,44 @@
+"""pg_trgm search indexes
+
+Revision ID: 214bec158d8d
+Revises: cf5bb73aca26
+Create Date: 2026-10-15 12:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '214bec158d8d'
+down_revision = 'cf5bb73aca26'
+branch_labels = None
+depends_on = None
+
+# (index name, table, column) for the trigram_index() declarations on the models
+TRIGRAM_INDEXES = [
+    ("ix_suppliers_name_trgm", "suppliers", "name"),
+    ("ix_suppliers_contact_person_trgm", "suppliers", "contact_person"),
+    ("ix_suppliers_email_trgm", "suppliers", "email"),
+    ("ix_users_username_trgm", "users", "username"),
+    ("ix_users_email_trgm", "users", "email"),
+    ("ix_users_full_name_trgm", "users", "full_name"),
+]
+
+
+def upgrade() -> None:
+    # gin_trgm_ops comes from the extension, so it has to exist first
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Tables not created yet get their indexes with them (create_all)
+    for name, table, column in TRIGRAM_INDEXES:
+        op.execute(
+            f"DO $$ BEGIN IF to_regclass('{table}') IS NOT NULL THEN "
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops); "
+            f"END IF; END $$"
+        )
+
+
+def downgrade() -> None:
+    for name, _, _ in TRIGRAM_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    # The extension is left installed; other objects may depend on it
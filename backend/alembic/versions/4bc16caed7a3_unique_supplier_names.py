@@ -0,0 +1,65 @@
+"""unique supplier names
+
+Revision ID: 4bc16caed7a3
+Revises: 0b2f04cd3b99
+Create Date: 2026-10-15 14:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4bc16caed7a3'
+down_revision = '0b2f04cd3b99'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name: str) -> bool:
+    bind = op.get_bind()
+    return bind.execute(sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+
+
+def _name_index_is_unique() -> bool:
+    bind = op.get_bind()
+    return bind.execute(sa.text(
+        "SELECT coalesce(bool_or(indisunique), false) FROM pg_index "
+        "WHERE indexrelid = to_regclass('ix_suppliers_name')"
+    )).scalar()
+
+
+def _replace_name_index(unique: bool) -> None:
+    """Swap ix_suppliers_name for a (non-)unique index without blocking writes."""
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_suppliers_name_new")
+        op.execute(f"CREATE {kind} CONCURRENTLY ix_suppliers_name_new ON suppliers (name)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_suppliers_name")
+        op.execute("ALTER INDEX ix_suppliers_name_new RENAME TO ix_suppliers_name")
+
+
+def upgrade() -> None:
+    # Tables not created yet get the unique index with them (create_all)
+    if not _has_table("suppliers") or _name_index_is_unique():
+        return
+
+    # Duplicates are left to an operator to merge: suppliers are referenced
+    # by items and orders, so picking a survivor isn't safe to automate
+    bind = op.get_bind()
+    duplicates = bind.execute(sa.text(
+        "SELECT name FROM suppliers GROUP BY name HAVING count(*) > 1 ORDER BY name LIMIT 20"
+    )).scalars().all()
+    if duplicates:
+        raise RuntimeError(
+            "Cannot make supplier names unique; merge or rename these suppliers first: "
+            + ", ".join(repr(name) for name in duplicates)
+        )
+
+    _replace_name_index(unique=True)
+
+
+def downgrade() -> None:
+    if not _has_table("suppliers") or not _name_index_is_unique():
+        return
+    _replace_name_index(unique=False)
@@ -0,0 +1,64 @@
+"""low stock partial index
+
+Revision ID: 9c0776776def
+Revises: 0910b88dddd0
+Create Date: 2026-10-15 14:00:00.000000
+
+"""
+from typing import Optional
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c0776776def'
+down_revision = '0910b88dddd0'
+branch_labels = None
+depends_on = None
+
+# Covering: the alert list and low-stock report read only these columns,
+# so they can be answered by an index-only scan
+CREATE_LOW_STOCK_INDEX = (
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+    "ON inventory_items (name) "
+    "INCLUDE (id, sku, quantity_in_stock, reorder_point, minimum_stock_level, supplier_id, is_tracked) "
+    "WHERE quantity_in_stock <= reorder_point"
+)
+
+
+def _has_table(name: str) -> bool:
+    bind = op.get_bind()
+    return bind.execute(sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+
+
+def _index_is_covering() -> Optional[bool]:
+    """Whether ix_inventory_items_low_stock has INCLUDE columns; None if it doesn't exist."""
+    bind = op.get_bind()
+    return bind.execute(sa.text(
+        "SELECT indnatts > indnkeyatts FROM pg_index "
+        "WHERE indexrelid = to_regclass('ix_inventory_items_low_stock')"
+    )).scalar()
+
+
+def upgrade() -> None:
+    # Tables not created yet get the index with them (create_all)
+    if not _has_table("inventory_items"):
+        return
+    covering = _index_is_covering()
+    # Built without locking out writes, which can't run inside a transaction
+    with op.get_context().autocommit_block():
+        if covering is None:
+            op.execute(CREATE_LOW_STOCK_INDEX.format(name="ix_inventory_items_low_stock"))
+        elif not covering:
+            # An earlier key-only version: build the covering one alongside,
+            # then swap it in so the low-stock reads are never unindexed
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_inventory_items_low_stock_new")
+            op.execute(CREATE_LOW_STOCK_INDEX.format(name="ix_inventory_items_low_stock_new"))
+            op.execute("DROP INDEX CONCURRENTLY ix_inventory_items_low_stock")
+            op.execute("ALTER INDEX ix_inventory_items_low_stock_new RENAME TO ix_inventory_items_low_stock")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_inventory_items_low_stock")
@@ -0,0 +1,48 @@
+"""history and foreign key indexes
+
+Revision ID: a9ec4b2b55f5
+Revises: 4bc16caed7a3
+Create Date: 2026-10-15 14:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9ec4b2b55f5'
+down_revision = '4bc16caed7a3'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns, partial index predicate) as declared on the models
+INDEXES = [
+    ("ix_inventory_updates_item_id_created_at", "inventory_updates", ["item_id", sa.text("created_at DESC")], None),
+    ("ix_inventory_items_supplier_id", "inventory_items", ["supplier_id"], None),
+    ("ix_order_items_order_id", "order_items", ["order_id"], None),
+    ("ix_users_active_role_full_name", "users", ["role", "full_name"], sa.text("is_active")),
+]
+
+
+def _has_table(name: str) -> bool:
+    bind = op.get_bind()
+    return bind.execute(sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+
+
+def upgrade() -> None:
+    # Tables not created yet get the indexes with them (create_all)
+    indexes = [index for index in INDEXES if _has_table(index[1])]
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in indexes:
+            op.create_index(
+                name, table, columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=where,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,32 @@
+"""order number sequence
+
+Revision ID: cf5bb73aca26
+Revises:
+Create Date: 2026-10-15 12:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cf5bb73aca26'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE IF NOT EXISTS order_number_seq")
+    # A database whose tables haven't been created yet gets the default
+    # with the table (see the after_create DDL in app.models.order)
+    op.execute(
+        "ALTER TABLE IF EXISTS orders ALTER COLUMN order_number SET DEFAULT "
+        "('ORD-' || to_char(now(), 'YYYYMMDD') || '-' || "
+        "lpad(CAST(nextval('order_number_seq') AS TEXT), 6, '0'))"
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE IF EXISTS orders ALTER COLUMN order_number DROP DEFAULT")
+    op.execute("DROP SEQUENCE IF EXISTS order_number_seq")
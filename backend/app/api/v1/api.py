@@ -3,7 +3,7 @@ Main API router that includes all endpoint routers.
 """
 
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, inventory, suppliers, orders, users
+from app.api.v1.endpoints import auth, inventory, suppliers, orders, users, reports
 
 api_router = APIRouter()
 
@@ -13,3 +13,4 @@ api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(inventory.router, prefix="/inventory", tags=["inventory"])
 api_router.include_router(suppliers.router, prefix="/suppliers", tags=["suppliers"])
 api_router.include_router(orders.router, prefix="/orders", tags=["orders"])
+api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
@@ -2,35 +2,68 @@
 Authentication endpoints for user login and token management.
 """
 
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import timedelta
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, func, or_, bindparam
 
+from app.core.cache import cache
 from app.core.database import get_db
-from app.core.security import verify_password, create_access_token, create_refresh_token, verify_token, get_current_user
+from app.core.security import (
+    verify_and_update_password,
+    create_access_token,
+    create_refresh_token,
+    verify_token,
+    get_current_user,
+    get_user_cached,
+    invalidate_user_cache,
+)
 from app.core.config import settings
 from app.models.user import User
 from app.schemas.user import UserLogin, Token, User as UserSchema
 
 router = APIRouter()
 
+# Login lookup by username or email, built once at import
+_SELECT_USER_BY_LOGIN = select(User).where(
+    or_(User.username == bindparam("login"), User.email == bindparam("login"))
+)
+
+# Failed login attempts per (client IP, username), forgotten after the lockout window
+_failed_logins: TTLCache = TTLCache(maxsize=10_000, ttl=settings.LOGIN_LOCKOUT_SECONDS)
+
 
 @router.post("/login", response_model=Token)
 async def login(
     user_credentials: UserLogin,
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     """Authenticate user and return access token."""
+    # Refuse further attempts once a client has exhausted its allowance,
+    # capping the password hashing work a brute-force run can trigger
+    client_host = request.client.host if request.client else None
+    attempt_key = (client_host, user_credentials.username)
+    failed_attempts = _failed_logins.get(attempt_key, 0)
+    if failed_attempts >= settings.LOGIN_MAX_FAILED_ATTEMPTS:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts, try again later"
+        )
+    
     # Find user by username or email
-    stmt = select(User).where(
-        (User.username == user_credentials.username) | 
-        (User.email == user_credentials.username)
-    )
-    result = await db.execute(stmt)
+    result = await db.execute(_SELECT_USER_BY_LOGIN, {"login": user_credentials.username})
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    password_valid, new_hash = False, None
+    if user:
+        password_valid, new_hash = await verify_and_update_password(
+            user_credentials.password, user.hashed_password
+        )
+    
+    if not password_valid:
+        _failed_logins[attempt_key] = failed_attempts + 1
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -43,9 +76,20 @@ async def login(
             detail="Inactive user account"
         )
     
-    # Update last login
-    user.last_login = datetime.utcnow()
+    # Update last login (and upgrade the password hash if its parameters
+    # changed) with a single UPDATE, bypassing ORM dirty tracking
+    values = {"last_login": func.now()}
+    if new_hash:
+        values["hashed_password"] = new_hash
+    stmt = update(User).where(User.id == user.id).values(
+        **values
+    ).execution_options(synchronize_session=False)
+    await db.execute(stmt)
     await db.commit()
+    await invalidate_user_cache(user.id)
+    # Cached /users responses include last_login
+    await cache.delete_pattern("user:*")
+    _failed_logins.pop(attempt_key, None)
     
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -81,9 +125,7 @@ async def refresh_token(
         )
     
     # Verify user still exists and is active
-    stmt = select(User).where(User.id == token_data.user_id)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = await get_user_cached(db, token_data.user_id)
     
     if not user or not user.is_active:
         raise HTTPException(
@@ -111,9 +153,7 @@ async def get_current_user_info(
     db: AsyncSession = Depends(get_db)
 ):
     """Get current user information."""
-    stmt = select(User).where(User.id == current_user["user_id"])
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = await get_user_cached(db, current_user["user_id"])
     
     if not user:
         raise HTTPException(
@@ -5,10 +5,14 @@ Inventory management endpoints for CRUD operations on inventory items.
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, func, and_, or_, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 
-from app.core.database import get_db
+from app.core.cache import cache, cached
+from app.core.database import get_db, violated_constraint
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.responses import adapter_response, adapter_stream_response, model_response
 from app.core.security import get_current_user, require_manager
 from app.models.inventory import InventoryItem, InventoryUpdate
 from app.models.supplier import Supplier
@@ -19,12 +23,36 @@ from app.schemas.inventory import (
     InventoryItemList,
     StockAdjustment,
     InventoryUpdate as InventoryUpdateSchema,
-    LowStockAlert
+    InventoryUpdateListAdapter,
+    LowStockAlert,
+    LowStockAlertListAdapter
 )
 from app.core.exceptions import ItemNotFoundException, InsufficientStockException
 
 router = APIRouter()
 
+# Only the low-stock alert list is cached; every stock or item write clears it
+CACHE_PREFIX = "inventory"
+
+
+# Client-facing messages for the integrity errors item writes can hit
+_ITEM_CONSTRAINT_ERRORS = {
+    "ix_inventory_items_sku": "Item with this SKU already exists",
+    "ix_inventory_items_barcode": "Item with this barcode already exists",
+    "inventory_items_supplier_id_fkey": "Supplier not found",
+}
+
+
+def _item_integrity_error(exc: IntegrityError) -> HTTPException:
+    """Translate a known constraint violation into a 400; re-raise anything else."""
+    detail = _ITEM_CONSTRAINT_ERRORS.get(violated_constraint(exc))
+    if detail is None:
+        raise exc
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=detail
+    )
+
 
 @router.get("/items", response_model=InventoryItemList)
 async def get_inventory_items(
@@ -33,14 +61,34 @@ async def get_inventory_items(
     search: Optional[str] = Query(None),
     category: Optional[str] = Query(None),
     low_stock_only: bool = Query(False),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get paginated list of inventory items with optional filtering."""
+    """
+    Get paginated list of inventory items with optional filtering.
+    
+    Passing ``after`` switches to keyset pagination: ``page`` is ignored and
+    no total is computed, so deep pages cost the same as the first one.
+    """
     offset = (page - 1) * size
     
-    # Build query
-    query = select(InventoryItem).options(selectinload(InventoryItem.supplier))
+    # Build query selecting only the list columns
+    columns = [
+        InventoryItem.id,
+        InventoryItem.sku,
+        InventoryItem.name,
+        InventoryItem.category,
+        InventoryItem.unit_price,
+        InventoryItem.quantity_in_stock,
+        InventoryItem.reorder_point,
+        InventoryItem.status,
+        Supplier.name.label("supplier_name"),
+    ]
+    if after is None:
+        # The window count returns the filtered total with each row
+        columns.append(func.count().over().label("total"))
+    query = select(*columns).outerjoin(Supplier, Supplier.id == InventoryItem.supplier_id)
     
     # Apply filters
     filters = []
@@ -56,31 +104,39 @@ async def get_inventory_items(
         filters.append(InventoryItem.category == category)
     
     if low_stock_only:
-        filters.append(InventoryItem.quantity_in_stock <= InventoryItem.reorder_point)
+        filters.append(InventoryItem.is_low_stock)
     
-    if filters:
-        query = query.where(and_(*filters))
+    if after is not None:
+        last_name, last_id = decode_cursor(after, str, int)
+        filters.append(tuple_(InventoryItem.name, InventoryItem.id) > tuple_(last_name, last_id))
     
-    # Get total count
-    count_query = select(func.count(InventoryItem.id))
     if filters:
-        count_query = count_query.where(and_(*filters))
-    
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+        query = query.where(and_(*filters))
     
     # Get paginated results
-    query = query.offset(offset).limit(size).order_by(InventoryItem.name)
+    query = query.limit(size).order_by(InventoryItem.name, InventoryItem.id)
+    if after is None:
+        query = query.offset(offset)
     result = await db.execute(query)
-    items = result.scalars().all()
+    rows = result.mappings().all()
+    
+    next_cursor = None
+    if len(rows) == size:
+        next_cursor = encode_cursor(rows[-1]["name"], rows[-1]["id"])
+    
+    if after is not None:
+        return model_response(InventoryItemList(items=rows, size=size, next_cursor=next_cursor))
+    
+    total = rows[0]["total"] if rows else 0
     
-    return InventoryItemList(
-        items=items,
+    return model_response(InventoryItemList(
+        items=rows,
         total=total,
         page=page,
         size=size,
-        pages=(total + size - 1) // size
-    )
+        pages=(total + size - 1) // size,
+        next_cursor=next_cursor
+    ))
 
 
 @router.get("/items/{item_id}", response_model=InventoryItemSchema)
@@ -90,9 +146,7 @@ async def get_inventory_item(
     current_user: dict = Depends(get_current_user)
 ):
     """Get a specific inventory item by ID."""
-    stmt = select(InventoryItem).options(selectinload(InventoryItem.supplier)).where(InventoryItem.id == item_id)
-    result = await db.execute(stmt)
-    item = result.scalar_one_or_none()
+    item = await db.get(InventoryItem, item_id)
     
     if not item:
         raise ItemNotFoundException(f"Inventory item with ID {item_id} not found")
@@ -107,30 +161,29 @@ async def create_inventory_item(
     current_user: dict = Depends(require_manager)
 ):
     """Create a new inventory item."""
-    # Check if SKU already exists
-    stmt = select(InventoryItem).where(InventoryItem.sku == item_data.sku)
-    result = await db.execute(stmt)
-    if result.scalar_one_or_none():
+    # Insert in one atomic round-trip; a SKU conflict returns no row and a
+    # barcode conflict surfaces as a unique constraint violation
+    stmt = insert(InventoryItem).values(
+        **item_data.dict()
+    ).on_conflict_do_nothing(
+        index_elements=[InventoryItem.sku]
+    ).returning(InventoryItem)
+    try:
+        result = await db.execute(stmt)
+        item = result.scalar_one_or_none()
+    except IntegrityError as exc:
+        await db.rollback()
+        raise _item_integrity_error(exc)
+    
+    if item is None:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Item with this SKU already exists"
         )
     
-    # Check if barcode already exists (if provided)
-    if item_data.barcode:
-        stmt = select(InventoryItem).where(InventoryItem.barcode == item_data.barcode)
-        result = await db.execute(stmt)
-        if result.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Item with this barcode already exists"
-            )
-    
-    # Create new item
-    item = InventoryItem(**item_data.dict())
-    db.add(item)
     await db.commit()
-    await db.refresh(item)
+    await cache.delete_pattern(f"{CACHE_PREFIX}:*")
     
     return item
 
@@ -150,33 +203,18 @@ async def update_inventory_item(
     if not item:
         raise ItemNotFoundException(f"Inventory item with ID {item_id} not found")
     
-    # Check SKU uniqueness if being updated
-    if item_data.sku and item_data.sku != item.sku:
-        stmt = select(InventoryItem).where(InventoryItem.sku == item_data.sku)
-        result = await db.execute(stmt)
-        if result.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Item with this SKU already exists"
-            )
-    
-    # Check barcode uniqueness if being updated
-    if item_data.barcode and item_data.barcode != item.barcode:
-        stmt = select(InventoryItem).where(InventoryItem.barcode == item_data.barcode)
-        result = await db.execute(stmt)
-        if result.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Item with this barcode already exists"
-            )
-    
-    # Update item
+    # Update item; SKU and barcode uniqueness is enforced by the database
     update_data = item_data.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(item, field, value)
     
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        raise _item_integrity_error(exc)
     await db.refresh(item)
+    await cache.delete_pattern(f"{CACHE_PREFIX}:*")
     
     return item
 
@@ -197,6 +235,7 @@ async def delete_inventory_item(
     
     await db.delete(item)
     await db.commit()
+    await cache.delete_pattern(f"{CACHE_PREFIX}:*")
     
     return {"message": "Inventory item deleted successfully"}
 
@@ -209,22 +248,34 @@ async def adjust_stock(
     current_user: dict = Depends(get_current_user)
 ):
     """Adjust stock quantity for an inventory item."""
-    stmt = select(InventoryItem).where(InventoryItem.id == item_id)
+    # Apply the change atomically; the row is only updated if it stays non-negative
+    stmt = update(InventoryItem).where(
+        InventoryItem.id == item_id,
+        InventoryItem.is_tracked.is_(True),
+        InventoryItem.quantity_in_stock + adjustment.quantity_change >= 0
+    ).values(
+        quantity_in_stock=InventoryItem.quantity_in_stock + adjustment.quantity_change
+    ).returning(
+        InventoryItem.quantity_in_stock
+    ).execution_options(synchronize_session=False)
     result = await db.execute(stmt)
-    item = result.scalar_one_or_none()
-    
-    if not item:
-        raise ItemNotFoundException(f"Inventory item with ID {item_id} not found")
+    new_quantity = result.scalar_one_or_none()
     
-    if not item.is_tracked:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="This item is not tracked for stock levels"
-        )
-    
-    new_quantity = item.quantity_in_stock + adjustment.quantity_change
-    
-    if new_quantity < 0:
+    if new_quantity is None:
+        # Nothing was updated; work out why
+        stmt = select(InventoryItem.is_tracked, InventoryItem.quantity_in_stock).where(InventoryItem.id == item_id)
+        result = await db.execute(stmt)
+        item = result.one_or_none()
+        
+        if not item:
+            raise ItemNotFoundException(f"Inventory item with ID {item_id} not found")
+        
+        if not item.is_tracked:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="This item is not tracked for stock levels"
+            )
+        
         raise InsufficientStockException(
             f"Insufficient stock. Current: {item.quantity_in_stock}, "
             f"Requested reduction: {abs(adjustment.quantity_change)}"
@@ -236,47 +287,43 @@ async def adjust_stock(
         user_id=current_user["user_id"],
         change_type=adjustment.reason,
         quantity_change=adjustment.quantity_change,
-        previous_quantity=item.quantity_in_stock,
+        previous_quantity=new_quantity - adjustment.quantity_change,
         new_quantity=new_quantity,
         reason=adjustment.reason,
         reference_number=adjustment.reference_number,
         notes=adjustment.notes
     )
     
-    # Update stock
-    item.quantity_in_stock = new_quantity
-    
     db.add(inventory_update)
     await db.commit()
+    await cache.delete_pattern(f"{CACHE_PREFIX}:*")
     
     return {"message": "Stock adjusted successfully", "new_quantity": new_quantity}
 
 
 @router.get("/items/low-stock", response_model=List[LowStockAlert])
+@cached(prefix=CACHE_PREFIX, expire=300)
 async def get_low_stock_items(
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Get all items that are below their reorder point."""
-    stmt = select(InventoryItem).options(selectinload(InventoryItem.supplier)).where(
-        InventoryItem.quantity_in_stock <= InventoryItem.reorder_point
+    stmt = select(
+        InventoryItem.id.label("item_id"),
+        InventoryItem.sku,
+        InventoryItem.name,
+        InventoryItem.quantity_in_stock.label("current_stock"),
+        InventoryItem.reorder_point,
+        InventoryItem.minimum_stock_level,
+        Supplier.name.label("supplier_name")
+    ).outerjoin(
+        Supplier, Supplier.id == InventoryItem.supplier_id
+    ).where(
+        InventoryItem.is_low_stock
     )
     result = await db.execute(stmt)
-    items = result.scalars().all()
     
-    alerts = []
-    for item in items:
-        alerts.append(LowStockAlert(
-            item_id=item.id,
-            sku=item.sku,
-            name=item.name,
-            current_stock=item.quantity_in_stock,
-            reorder_point=item.reorder_point,
-            minimum_stock_level=item.minimum_stock_level,
-            supplier_name=item.supplier.name if item.supplier else None
-        ))
-    
-    return alerts
+    return adapter_response(LowStockAlertListAdapter, result.mappings().all())
 
 
 @router.get("/items/{item_id}/history", response_model=List[InventoryUpdateSchema])
@@ -285,9 +332,20 @@ async def get_item_history(
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get stock movement history for an inventory item."""
-    stmt = select(InventoryUpdate).where(InventoryUpdate.item_id == item_id).order_by(InventoryUpdate.created_at.desc())
-    result = await db.execute(stmt)
-    updates = result.scalars().all()
+    """
+    Get stock movement history for an inventory item.
+    
+    The audit trail grows without bound, so rows are read with a server-side
+    cursor and written to the response in batches rather than loaded at once.
+    """
+    stmt = (
+        select(InventoryUpdate.__table__)
+        .where(InventoryUpdate.item_id == item_id)
+        .order_by(InventoryUpdate.created_at.desc())
+        .execution_options(yield_per=500)
+    )
+    # The session stays open until the response has been sent, as
+    # dependencies with yield are only torn down after that
+    result = await db.stream(stmt)
     
-    return updates
+    return adapter_stream_response(InventoryUpdateListAdapter, result.mappings().partitions())
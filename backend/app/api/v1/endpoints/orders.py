@@ -3,17 +3,21 @@ Order management endpoints for CRUD operations on orders.
 """
 
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, update, func, literal, and_, or_, tuple_
+from sqlalchemy.orm import selectinload, raiseload
 from decimal import Decimal
+from cachetools import TTLCache
 
+from app.core.cache import cache
 from app.core.database import get_db
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.responses import model_response
 from app.core.security import get_current_user, require_manager
 from app.models.order import Order, OrderItem, OrderType, OrderStatus
-from app.models.inventory import InventoryItem
+from app.models.inventory import InventoryItem, InventoryUpdate
 from app.models.supplier import Supplier
 from app.schemas.order import (
     Order as OrderSchema,
@@ -26,6 +30,14 @@ from app.core.exceptions import OrderNotFoundException, ItemNotFoundException
 
 router = APIRouter()
 
+# Summary stats are polled by dashboards; serve them from a short-lived cache
+_summary_cache: TTLCache = TTLCache(maxsize=1, ttl=5)
+
+
+# Loader options for Order queries: order items are selectin-loaded and any
+# other relationship access raises instead of silently issuing per-row SELECTs
+_ORDER_LOAD_OPTIONS = (selectinload(Order.order_items).raiseload("*"), raiseload("*"))
+
 
 @router.get("/", response_model=OrderList)
 async def get_orders(
@@ -34,18 +46,35 @@ async def get_orders(
     order_type: Optional[OrderType] = Query(None),
     status: Optional[OrderStatus] = Query(None),
     search: Optional[str] = Query(None),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get paginated list of orders with optional filtering."""
+    """
+    Get paginated list of orders with optional filtering.
+    
+    Passing ``after`` switches to keyset pagination: ``page`` is ignored and
+    no total is computed, so deep pages cost the same as the first one.
+    """
     offset = (page - 1) * size
     
-    # Build query
-    query = select(Order).options(
-        selectinload(Order.order_items).selectinload(OrderItem.item),
-        selectinload(Order.supplier),
-        selectinload(Order.user)
-    )
+    # Build query selecting only the list columns
+    columns = [
+        Order.id,
+        Order.order_number,
+        Order.order_type,
+        Order.status,
+        Order.total_amount,
+        Order.order_date,
+        Order.expected_delivery_date,
+        Order.tracking_number,
+        Supplier.name.label("supplier_name"),
+        Order.user_id,
+    ]
+    if after is None:
+        # The window count returns the filtered total with each row
+        columns.append(func.count().over().label("total"))
+    query = select(*columns).outerjoin(Supplier, Supplier.id == Order.supplier_id)
     
     # Apply filters
     filters = []
@@ -62,29 +91,39 @@ async def get_orders(
         )
         filters.append(search_filter)
     
-    if filters:
-        query = query.where(and_(*filters))
+    if after is not None:
+        last_date, last_id = decode_cursor(after, datetime, int)
+        filters.append(
+            tuple_(Order.order_date, Order.id) < tuple_(last_date, last_id)
+        )
     
-    # Get total count
-    count_query = select(func.count(Order.id))
     if filters:
-        count_query = count_query.where(and_(*filters))
-    
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+        query = query.where(and_(*filters))
     
     # Get paginated results
-    query = query.offset(offset).limit(size).order_by(Order.order_date.desc())
+    query = query.limit(size).order_by(Order.order_date.desc(), Order.id.desc())
+    if after is None:
+        query = query.offset(offset)
     result = await db.execute(query)
-    orders = result.scalars().all()
+    rows = result.mappings().all()
+    
+    next_cursor = None
+    if len(rows) == size:
+        next_cursor = encode_cursor(rows[-1]["order_date"], rows[-1]["id"])
+    
+    if after is not None:
+        return model_response(OrderList(orders=rows, size=size, next_cursor=next_cursor))
     
-    return OrderList(
-        orders=orders,
+    total = rows[0]["total"] if rows else 0
+    
+    return model_response(OrderList(
+        orders=rows,
         total=total,
         page=page,
         size=size,
-        pages=(total + size - 1) // size
-    )
+        pages=(total + size - 1) // size,
+        next_cursor=next_cursor
+    ))
 
 
 @router.get("/{order_id}", response_model=OrderSchema)
@@ -94,11 +133,7 @@ async def get_order(
     current_user: dict = Depends(get_current_user)
 ):
     """Get a specific order by ID."""
-    stmt = select(Order).options(
-        selectinload(Order.order_items).selectinload(OrderItem.item),
-        selectinload(Order.supplier),
-        selectinload(Order.user)
-    ).where(Order.id == order_id)
+    stmt = select(Order).options(*_ORDER_LOAD_OPTIONS).where(Order.id == order_id)
     
     result = await db.execute(stmt)
     order = result.scalar_one_or_none()
@@ -116,61 +151,57 @@ async def create_order(
     current_user: dict = Depends(get_current_user)
 ):
     """Create a new order."""
-    # Generate order number
-    order_number = f"ORD-{datetime.now().strftime('%Y%m%d')}-{current_user['user_id']:04d}"
-    
-    # Calculate totals
-    total_amount = Decimal('0')
-    for item in order_data.order_items:
-        item_total = item.quantity * item.unit_price
-        total_amount += item_total
-    
-    # Create order
-    order = Order(
-        order_number=order_number,
-        order_type=order_data.order_type,
-        status=order_data.status,
+    # Verify all referenced items exist in a single query
+    item_ids = {item.item_id for item in order_data.order_items}
+    stmt = select(InventoryItem.id).where(InventoryItem.id.in_(item_ids))
+    result = await db.execute(stmt)
+    missing_ids = item_ids - set(result.scalars().all())
+    
+    if missing_ids:
+        raise ItemNotFoundException(
+            f"Inventory items with IDs {sorted(missing_ids)} not found"
+        )
+    
+    # Calculate line totals once; they feed both the order total and the items
+    line_totals = [item.quantity * item.unit_price for item in order_data.order_items]
+    total_amount = sum(line_totals, Decimal('0'))
+    
+    # Create the order and its items with Core inserts; the order number is
+    # generated by the database and nothing goes through the unit of work
+    stmt = insert(Order).values(
+        **order_data.dict(exclude={"order_items"}),
         total_amount=total_amount,
-        expected_delivery_date=order_data.expected_delivery_date,
-        shipping_address=order_data.shipping_address,
-        shipping_city=order_data.shipping_city,
-        shipping_state=order_data.shipping_state,
-        shipping_country=order_data.shipping_country,
-        shipping_postal_code=order_data.shipping_postal_code,
-        notes=order_data.notes,
-        internal_notes=order_data.internal_notes,
-        tracking_number=order_data.tracking_number,
-        supplier_id=order_data.supplier_id,
         user_id=current_user['user_id']
+    ).returning(Order.id)
+    result = await db.execute(stmt)
+    order_id = result.scalar_one()
+    
+    # Create order items with a single multi-row INSERT
+    await db.execute(
+        insert(OrderItem),
+        [
+            {
+                "order_id": order_id,
+                "item_id": item_data.item_id,
+                "quantity": item_data.quantity,
+                "unit_price": item_data.unit_price,
+                "total_price": line_total,
+                "notes": item_data.notes,
+            }
+            for item_data, line_total in zip(order_data.order_items, line_totals)
+        ]
     )
     
-    db.add(order)
-    await db.flush()  # Get the order ID
-    
-    # Create order items
-    for item_data in order_data.order_items:
-        # Verify item exists
-        stmt = select(InventoryItem).where(InventoryItem.id == item_data.item_id)
-        result = await db.execute(stmt)
-        item = result.scalar_one_or_none()
-        
-        if not item:
-            raise ItemNotFoundException(f"Inventory item with ID {item_data.item_id} not found")
-        
-        order_item = OrderItem(
-            order_id=order.id,
-            item_id=item_data.item_id,
-            quantity=item_data.quantity,
-            unit_price=item_data.unit_price,
-            total_price=item_data.quantity * item_data.unit_price,
-            notes=item_data.notes
-        )
-        db.add(order_item)
-    
     await db.commit()
-    await db.refresh(order)
+    _summary_cache.clear()
     
-    return order
+    # Reload the order with its items for the response
+    stmt = select(Order).options(
+        *_ORDER_LOAD_OPTIONS
+    ).where(Order.id == order_id)
+    result = await db.execute(stmt)
+    
+    return result.scalar_one()
 
 
 @router.put("/{order_id}", response_model=OrderSchema)
@@ -181,7 +212,7 @@ async def update_order(
     current_user: dict = Depends(require_manager)
 ):
     """Update an existing order."""
-    stmt = select(Order).where(Order.id == order_id)
+    stmt = select(Order).options(*_ORDER_LOAD_OPTIONS).where(Order.id == order_id)
     result = await db.execute(stmt)
     order = result.scalar_one_or_none()
     
@@ -195,6 +226,7 @@ async def update_order(
     
     await db.commit()
     await db.refresh(order)
+    _summary_cache.clear()
     
     return order
 
@@ -206,7 +238,7 @@ async def delete_order(
     current_user: dict = Depends(require_manager)
 ):
     """Delete an order."""
-    stmt = select(Order).where(Order.id == order_id)
+    stmt = select(Order).options(*_ORDER_LOAD_OPTIONS).where(Order.id == order_id)
     result = await db.execute(stmt)
     order = result.scalar_one_or_none()
     
@@ -222,6 +254,7 @@ async def delete_order(
     
     await db.delete(order)
     await db.commit()
+    _summary_cache.clear()
     
     return {"message": "Order deleted successfully"}
 
@@ -234,7 +267,7 @@ async def update_order_status(
     current_user: dict = Depends(require_manager)
 ):
     """Update order status."""
-    stmt = select(Order).where(Order.id == order_id)
+    stmt = select(Order).options(*_ORDER_LOAD_OPTIONS).where(Order.id == order_id)
     result = await db.execute(stmt)
     order = result.scalar_one_or_none()
     
@@ -247,9 +280,13 @@ async def update_order_status(
     
     order.status = new_status
     if new_status == OrderStatus.DELIVERED:
-        order.actual_delivery_date = datetime.utcnow()
+        order.actual_delivery_date = datetime.now(timezone.utc)
     
     await db.commit()
+    _summary_cache.clear()
+    if new_status == OrderStatus.DELIVERED:
+        # Stock levels changed; drop the cached low-stock alerts
+        await cache.delete_pattern("inventory:*")
     
     return {"message": f"Order status updated to {new_status.value}"}
 
@@ -260,78 +297,74 @@ async def get_order_summary(
     current_user: dict = Depends(get_current_user)
 ):
     """Get order summary statistics."""
-    # Total orders
-    total_orders_stmt = select(func.count(Order.id))
-    total_orders_result = await db.execute(total_orders_stmt)
-    total_orders = total_orders_result.scalar()
-    
-    # Orders by status
-    pending_stmt = select(func.count(Order.id)).where(Order.status == OrderStatus.PENDING)
-    pending_result = await db.execute(pending_stmt)
-    pending_orders = pending_result.scalar()
-    
-    completed_stmt = select(func.count(Order.id)).where(Order.status == OrderStatus.DELIVERED)
-    completed_result = await db.execute(completed_stmt)
-    completed_orders = completed_result.scalar()
-    
-    cancelled_stmt = select(func.count(Order.id)).where(Order.status == OrderStatus.CANCELLED)
-    cancelled_result = await db.execute(cancelled_stmt)
-    cancelled_orders = cancelled_result.scalar()
-    
-    # Total value
-    total_value_stmt = select(func.sum(Order.total_amount))
-    total_value_result = await db.execute(total_value_stmt)
-    total_value = total_value_result.scalar() or Decimal('0')
-    
-    # Average order value
-    avg_value = total_value / total_orders if total_orders > 0 else Decimal('0')
-    
-    return OrderSummary(
-        total_orders=total_orders,
-        pending_orders=pending_orders,
-        completed_orders=completed_orders,
-        cancelled_orders=cancelled_orders,
-        total_value=total_value,
-        average_order_value=avg_value
+    summary = _summary_cache.get("summary")
+    if summary is None:
+        summary = await _compute_summary(db)
+        _summary_cache["summary"] = summary
+    
+    return summary
+
+
+async def _compute_summary(db: AsyncSession) -> OrderSummary:
+    """Compute order summary statistics from the database."""
+    # Counts by status, total and average value in a single aggregate query
+    stmt = select(
+        func.count(Order.id).label("total_orders"),
+        func.count(Order.id).filter(Order.status == OrderStatus.PENDING).label("pending_orders"),
+        func.count(Order.id).filter(Order.status == OrderStatus.DELIVERED).label("completed_orders"),
+        func.count(Order.id).filter(Order.status == OrderStatus.CANCELLED).label("cancelled_orders"),
+        func.coalesce(func.sum(Order.total_amount), 0).label("total_value"),
+        func.coalesce(func.avg(Order.total_amount), 0).label("average_order_value")
     )
+    result = await db.execute(stmt)
+    
+    return OrderSummary(**result.one()._mapping)
 
 
 async def _update_stock_for_delivered_order(order: Order, db: AsyncSession, current_user: dict):
     """Update stock levels when an order is delivered."""
-    from app.models.inventory import InventoryUpdate
-    
-    for order_item in order.order_items:
-        item = order_item.item
-        
-        if not item.is_tracked:
-            continue
-        
-        # For purchase orders, increase stock
-        if order.order_type == OrderType.PURCHASE:
-            quantity_change = order_item.quantity
-            change_type = "purchase"
-        # For sales orders, decrease stock
-        elif order.order_type == OrderType.SALE:
-            quantity_change = -order_item.quantity
-            change_type = "sale"
-        else:
-            continue
-        
-        new_quantity = item.quantity_in_stock + quantity_change
-        
-        # Record the change
-        inventory_update = InventoryUpdate(
-            item_id=item.id,
-            user_id=current_user['user_id'],
-            change_type=change_type,
-            quantity_change=quantity_change,
-            previous_quantity=item.quantity_in_stock,
-            new_quantity=new_quantity,
-            reason=f"Order {order.order_number} delivered",
-            reference_number=order.order_number
+    # For purchase orders, increase stock; for sales orders, decrease stock
+    if order.order_type == OrderType.PURCHASE:
+        sign, change_type = 1, "purchase"
+    elif order.order_type == OrderType.SALE:
+        sign, change_type = -1, "sale"
+    else:
+        return
+    
+    # Net quantity per item across the order's lines
+    deltas = select(
+        OrderItem.item_id,
+        (sign * func.sum(OrderItem.quantity)).label("delta")
+    ).where(OrderItem.order_id == order.id).group_by(OrderItem.item_id).subquery("deltas")
+    
+    # Apply the stock changes to tracked items and record them in one
+    # statement: the UPDATE runs as a data-modifying CTE and its RETURNING
+    # rows feed INSERT ... SELECT, so no rows travel through Python
+    updated = update(InventoryItem).where(
+        InventoryItem.id == deltas.c.item_id,
+        InventoryItem.is_tracked.is_(True)
+    ).values(
+        quantity_in_stock=InventoryItem.quantity_in_stock + deltas.c.delta
+    ).returning(
+        InventoryItem.id.label("item_id"),
+        InventoryItem.quantity_in_stock.label("new_quantity"),
+        deltas.c.delta
+    ).cte("updated")
+    
+    stmt = insert(InventoryUpdate).from_select(
+        [
+            "item_id", "user_id", "change_type", "quantity_change",
+            "previous_quantity", "new_quantity", "reason", "reference_number",
+        ],
+        select(
+            updated.c.item_id,
+            literal(current_user['user_id']),
+            literal(change_type),
+            updated.c.delta,
+            updated.c.new_quantity - updated.c.delta,
+            updated.c.new_quantity,
+            literal(f"Order {order.order_number} delivered"),
+            literal(order.order_number),
         )
-        
-        # Update stock
-        item.quantity_in_stock = new_quantity
-        
-        db.add(inventory_update)
+    ).add_cte(updated)
+    await db.execute(stmt)
@@ -0,0 +1,41 @@
+"""
+Report download endpoints for files written by the report tasks.
+"""
+
+import os
+import re
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.core.config import settings
+from app.core.security import require_manager
+
+router = APIRouter()
+
+# Names produced by app.tasks.report_tasks; anything else (including paths)
+# is rejected before touching the filesystem
+_REPORT_FILE_NAME = re.compile(r"report_[0-9a-f_]+\.(csv|json)")
+
+_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "json": "application/json",
+}
+
+
+@router.get("/{file_name}")
+async def download_report(
+    file_name: str,
+    current_user: dict = Depends(require_manager)
+):
+    """Download a generated report file."""
+    match = _REPORT_FILE_NAME.fullmatch(file_name)
+    path = os.path.join(settings.REPORTS_DIR, file_name)
+
+    if match is None or not os.path.isfile(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found"
+        )
+
+    return FileResponse(path, media_type=_MEDIA_TYPES[match.group(1)], filename=file_name)
@@ -5,10 +5,14 @@ Supplier management endpoints for CRUD operations on suppliers.
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, insert, update, func, and_, or_, tuple_
+from sqlalchemy.exc import IntegrityError
 
-from app.core.database import get_db
+from app.core.cache import cache, cached
+from app.core.database import get_db, violated_constraint
+from app.core.pagination import encode_cursor, decode_cursor
 from app.core.security import get_current_user, require_manager
+from app.models.inventory import InventoryItem
 from app.models.supplier import Supplier
 from app.schemas.supplier import (
     Supplier as SupplierSchema,
@@ -20,21 +24,65 @@ from app.core.exceptions import SupplierNotFoundException
 
 router = APIRouter()
 
+CACHE_PREFIX = "supplier"
+
+
+def _duplicate_supplier_error(exc: IntegrityError) -> HTTPException:
+    """Translate a unique violation on the supplier name into a 400; re-raise anything else."""
+    if violated_constraint(exc) != "ix_suppliers_name":
+        raise exc
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Supplier with this name already exists"
+    )
+
+# Columns returned by the supplier list, matching the response schema
+_SUPPLIER_LIST_COLUMNS = (
+    Supplier.id,
+    Supplier.name,
+    Supplier.contact_person,
+    Supplier.email,
+    Supplier.phone,
+    Supplier.address,
+    Supplier.city,
+    Supplier.state,
+    Supplier.country,
+    Supplier.postal_code,
+    Supplier.tax_id,
+    Supplier.payment_terms,
+    Supplier.credit_limit,
+    Supplier.is_active,
+    Supplier.notes,
+    Supplier.created_at,
+    Supplier.updated_at,
+)
+
 
 @router.get("/", response_model=SupplierList)
+@cached(prefix=CACHE_PREFIX, expire=300, model=SupplierList)
 async def get_suppliers(
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
     search: Optional[str] = Query(None),
     active_only: bool = Query(True),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get paginated list of suppliers with optional filtering."""
+    """
+    Get paginated list of suppliers with optional filtering.
+    
+    Passing ``after`` switches to keyset pagination: ``page`` is ignored and
+    no total is computed, so deep pages cost the same as the first one.
+    """
     offset = (page - 1) * size
     
-    # Build query
-    query = select(Supplier)
+    # Build query; without a cursor the window count returns the filtered
+    # total with each row
+    if after is None:
+        query = select(*_SUPPLIER_LIST_COLUMNS, func.count().over().label("total"))
+    else:
+        query = select(*_SUPPLIER_LIST_COLUMNS)
     
     # Apply filters
     filters = []
@@ -49,41 +97,48 @@ async def get_suppliers(
     if active_only:
         filters.append(Supplier.is_active == True)
     
-    if filters:
-        query = query.where(and_(*filters))
+    if after is not None:
+        last_name, last_id = decode_cursor(after, str, int)
+        filters.append(tuple_(Supplier.name, Supplier.id) > tuple_(last_name, last_id))
     
-    # Get total count
-    count_query = select(func.count(Supplier.id))
     if filters:
-        count_query = count_query.where(and_(*filters))
-    
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+        query = query.where(and_(*filters))
     
     # Get paginated results
-    query = query.offset(offset).limit(size).order_by(Supplier.name)
+    query = query.limit(size).order_by(Supplier.name, Supplier.id)
+    if after is None:
+        query = query.offset(offset)
     result = await db.execute(query)
-    suppliers = result.scalars().all()
+    rows = result.mappings().all()
+    
+    next_cursor = None
+    if len(rows) == size:
+        next_cursor = encode_cursor(rows[-1]["name"], rows[-1]["id"])
+    
+    if after is not None:
+        return SupplierList(suppliers=rows, size=size, next_cursor=next_cursor)
+    
+    total = rows[0]["total"] if rows else 0
     
     return SupplierList(
-        suppliers=suppliers,
+        suppliers=rows,
         total=total,
         page=page,
         size=size,
-        pages=(total + size - 1) // size
+        pages=(total + size - 1) // size,
+        next_cursor=next_cursor
     )
 
 
 @router.get("/{supplier_id}", response_model=SupplierSchema)
+@cached(prefix=CACHE_PREFIX, expire=300, model=SupplierSchema)
 async def get_supplier(
     supplier_id: int,
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
     """Get a specific supplier by ID."""
-    stmt = select(Supplier).where(Supplier.id == supplier_id)
-    result = await db.execute(stmt)
-    supplier = result.scalar_one_or_none()
+    supplier = await db.get(Supplier, supplier_id)
     
     if not supplier:
         raise SupplierNotFoundException(f"Supplier with ID {supplier_id} not found")
@@ -98,20 +153,17 @@ async def create_supplier(
     current_user: dict = Depends(require_manager)
 ):
     """Create a new supplier."""
-    # Check if supplier with same name already exists
-    stmt = select(Supplier).where(Supplier.name == supplier_data.name)
-    result = await db.execute(stmt)
-    if result.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Supplier with this name already exists"
-        )
-    
-    # Create new supplier
-    supplier = Supplier(**supplier_data.dict())
-    db.add(supplier)
-    await db.commit()
-    await db.refresh(supplier)
+    # Create new supplier; name uniqueness is enforced by the database and
+    # RETURNING hands back the server-generated columns without a refresh
+    stmt = insert(Supplier).values(**supplier_data.dict()).returning(Supplier)
+    try:
+        result = await db.execute(stmt)
+        supplier = result.scalar_one()
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        raise _duplicate_supplier_error(exc)
+    await cache.delete_pattern(f"{CACHE_PREFIX}:*")
     
     return supplier
 
@@ -124,30 +176,28 @@ async def update_supplier(
     current_user: dict = Depends(require_manager)
 ):
     """Update an existing supplier."""
-    stmt = select(Supplier).where(Supplier.id == supplier_id)
-    result = await db.execute(stmt)
-    supplier = result.scalar_one_or_none()
+    update_data = supplier_data.dict(exclude_unset=True)
+    if update_data:
+        # Update supplier, reading the new row back with RETURNING; name
+        # uniqueness is enforced by the unique ix_suppliers_name index
+        # (migration 4bc16caed7a3 on existing databases)
+        stmt = update(Supplier).where(Supplier.id == supplier_id).values(**update_data).returning(Supplier)
+        try:
+            result = await db.execute(stmt)
+            supplier = result.scalar_one_or_none()
+            await db.commit()
+        except IntegrityError as exc:
+            await db.rollback()
+            raise _duplicate_supplier_error(exc)
+    else:
+        supplier = await db.get(Supplier, supplier_id)
     
     if not supplier:
         raise SupplierNotFoundException(f"Supplier with ID {supplier_id} not found")
     
-    # Check name uniqueness if being updated
-    if supplier_data.name and supplier_data.name != supplier.name:
-        stmt = select(Supplier).where(Supplier.name == supplier_data.name)
-        result = await db.execute(stmt)
-        if result.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Supplier with this name already exists"
-            )
-    
-    # Update supplier
-    update_data = supplier_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(supplier, field, value)
-    
-    await db.commit()
-    await db.refresh(supplier)
+    await cache.delete_pattern(f"{CACHE_PREFIX}:*")
+    # Low-stock alerts carry the supplier name
+    await cache.delete_pattern("inventory:*")
     
     return supplier
 
@@ -159,18 +209,20 @@ async def delete_supplier(
     current_user: dict = Depends(require_manager)
 ):
     """Delete a supplier."""
-    stmt = select(Supplier).where(Supplier.id == supplier_id)
+    # Fetch the supplier together with its associated item count
+    item_count = (
+        select(func.count(InventoryItem.id))
+        .where(InventoryItem.supplier_id == supplier_id)
+        .scalar_subquery()
+    )
+    stmt = select(Supplier, item_count.label("item_count")).where(Supplier.id == supplier_id)
     result = await db.execute(stmt)
-    supplier = result.scalar_one_or_none()
+    row = result.one_or_none()
     
-    if not supplier:
+    if not row:
         raise SupplierNotFoundException(f"Supplier with ID {supplier_id} not found")
     
-    # Check if supplier has associated items
-    from app.models.inventory import InventoryItem
-    stmt = select(func.count(InventoryItem.id)).where(InventoryItem.supplier_id == supplier_id)
-    result = await db.execute(stmt)
-    item_count = result.scalar()
+    supplier, item_count = row
     
     if item_count > 0:
         raise HTTPException(
@@ -180,6 +232,7 @@ async def delete_supplier(
     
     await db.delete(supplier)
     await db.commit()
+    await cache.delete_pattern(f"{CACHE_PREFIX}:*")
     
     return {"message": "Supplier deleted successfully"}
 
@@ -191,15 +244,14 @@ async def toggle_supplier_status(
     current_user: dict = Depends(require_manager)
 ):
     """Toggle supplier active status."""
-    stmt = select(Supplier).where(Supplier.id == supplier_id)
-    result = await db.execute(stmt)
-    supplier = result.scalar_one_or_none()
+    supplier = await db.get(Supplier, supplier_id)
     
     if not supplier:
         raise SupplierNotFoundException(f"Supplier with ID {supplier_id} not found")
     
     supplier.is_active = not supplier.is_active
     await db.commit()
+    await cache.delete_pattern(f"{CACHE_PREFIX}:*")
     
     return {
         "message": f"Supplier {'activated' if supplier.is_active else 'deactivated'} successfully",
@@ -2,40 +2,87 @@
 User management endpoints for CRUD operations on users.
 """
 
+import asyncio
 from typing import List, Optional
+from celery.result import AsyncResult
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, insert, update, func, and_, or_, tuple_
+from sqlalchemy.exc import IntegrityError
 
-from app.core.database import get_db
-from app.core.security import get_current_user, require_admin, get_password_hash
-from app.models.user import User, UserRole
+from app.core.cache import cache, cached
+from app.core.celery_app import celery_app
+from app.core.database import get_db, violated_constraint
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.security import get_current_user, require_admin, hash_password_async, invalidate_user_cache
+from app.models.user import User, UserRole, USER_UNIQUE_FIELDS
 from app.schemas.user import (
     User as UserSchema,
     UserCreate,
     UserUpdate,
-    UserList
+    UserList,
+    UserTaskAccepted
 )
 from app.core.exceptions import AuthenticationException
+from app.tasks.user_tasks import create_user_task
 
 router = APIRouter()
 
+CACHE_PREFIX = "user"
+
+# Columns returned by the user list; never includes hashed_password
+_USER_LIST_COLUMNS = (
+    User.id,
+    User.email,
+    User.username,
+    User.full_name,
+    User.role,
+    User.is_active,
+    User.is_verified,
+    User.created_at,
+    User.updated_at,
+    User.last_login,
+)
+
+
+def _duplicate_user_error(exc: IntegrityError) -> HTTPException:
+    """Translate a unique violation on username/email into a 400; re-raise anything else."""
+    field = USER_UNIQUE_FIELDS.get(violated_constraint(exc))
+    if field is None:
+        raise exc
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"{field} already exists"
+    )
+
 
 @router.get("/", response_model=UserList)
+@cached(prefix=CACHE_PREFIX, expire=300, model=UserList)
 async def get_users(
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
     search: Optional[str] = Query(None),
     role: Optional[UserRole] = Query(None),
     active_only: bool = Query(True),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
-    """Get paginated list of users with optional filtering."""
+    """
+    Get paginated list of users with optional filtering.
+    
+    Passing ``after`` switches to keyset pagination: ``page`` is ignored and
+    no total is computed, so deep pages cost the same as the first one.
+    """
     offset = (page - 1) * size
     
-    # Build query
-    query = select(User)
+    # Build query; without a cursor the window count returns the filtered
+    # total with each row
+    if after is None:
+        query = select(*_USER_LIST_COLUMNS, func.count().over().label("total"))
+    else:
+        query = select(*_USER_LIST_COLUMNS)
     
     # Apply filters
     filters = []
@@ -53,41 +100,48 @@ async def get_users(
     if active_only:
         filters.append(User.is_active == True)
     
+    if after is not None:
+        last_full_name, last_id = decode_cursor(after, str, int)
+        filters.append(tuple_(User.full_name, User.id) > tuple_(last_full_name, last_id))
+    
     if filters:
         query = query.where(and_(*filters))
     
-    # Get total count
-    count_query = select(func.count(User.id))
-    if filters:
-        count_query = count_query.where(and_(*filters))
+    # Get paginated results; id breaks ties between equal full names
+    query = query.limit(size).order_by(User.full_name, User.id)
+    if after is None:
+        query = query.offset(offset)
+    result = await db.execute(query)
+    rows = result.mappings().all()
     
-    total_result = await db.execute(count_query)
-    total = total_result.scalar()
+    next_cursor = None
+    if len(rows) == size:
+        next_cursor = encode_cursor(rows[-1]["full_name"], rows[-1]["id"])
     
-    # Get paginated results
-    query = query.offset(offset).limit(size).order_by(User.full_name)
-    result = await db.execute(query)
-    users = result.scalars().all()
+    if after is not None:
+        return UserList(users=rows, size=size, next_cursor=next_cursor)
+    
+    total = rows[0]["total"] if rows else 0
     
     return UserList(
-        users=users,
+        users=rows,
         total=total,
         page=page,
         size=size,
-        pages=(total + size - 1) // size
+        pages=(total + size - 1) // size,
+        next_cursor=next_cursor
     )
 
 
 @router.get("/{user_id}", response_model=UserSchema)
+@cached(prefix=CACHE_PREFIX, expire=300, model=UserSchema)
 async def get_user(
     user_id: int,
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
     """Get a specific user by ID."""
-    stmt = select(User).where(User.id == user_id)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = await db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -98,49 +152,71 @@ async def get_user(
     return user
 
 
-@router.post("/", response_model=UserSchema)
+@router.post(
+    "/",
+    response_model=UserSchema,
+    responses={status.HTTP_202_ACCEPTED: {"model": UserTaskAccepted, "description": "Queued with ?async=1"}}
+)
 async def create_user(
     user_data: UserCreate,
+    run_async: bool = Query(False, alias="async", description="Create the user in a background task"),
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(require_admin)
 ):
-    """Create a new user."""
-    # Check if username already exists
-    stmt = select(User).where(User.username == user_data.username)
-    result = await db.execute(stmt)
-    if result.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already exists"
+    """
+    Create a new user.
+    
+    With ``?async=1`` the password hashing and insert run in a Celery task
+    and the response is ``202 Accepted`` with a task ID to poll at
+    ``/users/tasks/{task_id}``; useful for bulk provisioning scripts.
+    """
+    if run_async:
+        task = await asyncio.to_thread(create_user_task.delay, user_data.dict())
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=UserTaskAccepted(task_id=task.id).model_dump()
         )
     
-    # Check if email already exists
-    stmt = select(User).where(User.email == user_data.email)
-    result = await db.execute(stmt)
-    if result.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already exists"
-        )
-    
-    # Create new user
-    hashed_password = get_password_hash(user_data.password)
-    user = User(
+    # Create new user; username and email uniqueness is enforced by the database
+    hashed_password = await hash_password_async(user_data.password)
+    stmt = insert(User).values(
         username=user_data.username,
         email=user_data.email,
         full_name=user_data.full_name,
         role=user_data.role,
         is_active=user_data.is_active,
         hashed_password=hashed_password
-    )
+    ).returning(User)
     
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
+    try:
+        result = await db.execute(stmt)
+        user = result.scalar_one()
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        raise _duplicate_user_error(exc)
+    await cache.delete_pattern(f"{CACHE_PREFIX}:*")
     
     return user
 
 
+@router.get("/tasks/{task_id}")
+async def get_user_task_status(
+    task_id: str,
+    current_user: dict = Depends(require_admin)
+):
+    """Get the status of a background user creation task."""
+    result = AsyncResult(task_id, app=celery_app)
+    
+    response = {"task_id": task_id, "status": result.status}
+    if result.successful():
+        response["result"] = result.result
+    elif result.failed():
+        response["error"] = str(result.result)
+    
+    return response
+
+
 @router.put("/{user_id}", response_model=UserSchema)
 async def update_user(
     user_id: int,
@@ -149,9 +225,24 @@ async def update_user(
     current_user: dict = Depends(require_admin)
 ):
     """Update an existing user."""
-    stmt = select(User).where(User.id == user_id)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    update_data = user_data.dict(exclude_unset=True)
+    password = update_data.pop("password", None)
+    if password:
+        update_data["hashed_password"] = await hash_password_async(password)
+    
+    if update_data:
+        # Update user, reading the new row back with RETURNING; username and
+        # email uniqueness is enforced by the database
+        stmt = update(User).where(User.id == user_id).values(**update_data).returning(User)
+        try:
+            result = await db.execute(stmt)
+            user = result.scalar_one_or_none()
+            await db.commit()
+        except IntegrityError as exc:
+            await db.rollback()
+            raise _duplicate_user_error(exc)
+    else:
+        user = await db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -159,36 +250,8 @@ async def update_user(
             detail="User not found"
         )
     
-    # Check username uniqueness if being updated
-    if user_data.username and user_data.username != user.username:
-        stmt = select(User).where(User.username == user_data.username)
-        result = await db.execute(stmt)
-        if result.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already exists"
-            )
-    
-    # Check email uniqueness if being updated
-    if user_data.email and user_data.email != user.email:
-        stmt = select(User).where(User.email == user_data.email)
-        result = await db.execute(stmt)
-        if result.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already exists"
-            )
-    
-    # Update user
-    update_data = user_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        if field == "password" and value:
-            setattr(user, "hashed_password", get_password_hash(value))
-        else:
-            setattr(user, field, value)
-    
-    await db.commit()
-    await db.refresh(user)
+    await invalidate_user_cache(user_id)
+    await cache.delete_pattern(f"{CACHE_PREFIX}:*")
     
     return user
 
@@ -207,9 +270,7 @@ async def delete_user(
             detail="Cannot delete your own account"
         )
     
-    stmt = select(User).where(User.id == user_id)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = await db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -219,6 +280,8 @@ async def delete_user(
     
     await db.delete(user)
     await db.commit()
+    await invalidate_user_cache(user_id)
+    await cache.delete_pattern(f"{CACHE_PREFIX}:*")
     
     return {"message": "User deleted successfully"}
 
@@ -237,9 +300,7 @@ async def toggle_user_status(
             detail="Cannot deactivate your own account"
         )
     
-    stmt = select(User).where(User.id == user_id)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = await db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -249,6 +310,8 @@ async def toggle_user_status(
     
     user.is_active = not user.is_active
     await db.commit()
+    await invalidate_user_cache(user_id)
+    await cache.delete_pattern(f"{CACHE_PREFIX}:*")
     
     return {
         "message": f"User {'activated' if user.is_active else 'deactivated'} successfully",
@@ -264,9 +327,7 @@ async def change_user_password(
     current_user: dict = Depends(require_admin)
 ):
     """Change user password."""
-    stmt = select(User).where(User.id == user_id)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
+    user = await db.get(User, user_id)
     
     if not user:
         raise HTTPException(
@@ -274,7 +335,8 @@ async def change_user_password(
             detail="User not found"
         )
     
-    user.hashed_password = get_password_hash(new_password)
+    user.hashed_password = await hash_password_async(new_password)
     await db.commit()
+    await cache.delete_pattern(f"{CACHE_PREFIX}:*")
     
     return {"message": "Password changed successfully"}
@@ -0,0 +1,148 @@
+"""
+Redis-backed response cache for read-mostly GET endpoints.
+"""
+
+import functools
+import inspect
+import logging
+from typing import Any, Callable, Optional, Type
+
+from fastapi import Response
+from fastapi.params import Depends
+from pydantic import BaseModel
+import redis
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.responses import model_response
+
+logger = logging.getLogger(__name__)
+
+
+class RedisCache:
+    """Thin async wrapper around a Redis connection pool.
+
+    Until connect() has been called every operation is a no-op, so the API
+    keeps working (uncached) when Redis is not configured or unreachable.
+    """
+
+    def __init__(self) -> None:
+        self._pool: Optional[aioredis.ConnectionPool] = None
+        self._client: Optional[aioredis.Redis] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._client is not None
+
+    async def connect(self, url: str, password: Optional[str] = None, max_connections: int = 20) -> None:
+        self._pool = aioredis.ConnectionPool.from_url(
+            url, password=password, max_connections=max_connections
+        )
+        self._client = aioredis.Redis(connection_pool=self._pool)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        if self._pool is not None:
+            await self._pool.disconnect()
+        self._client = None
+        self._pool = None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        try:
+            return await self._client.get(key)
+        except RedisError as exc:
+            logger.warning(f"Cache read failed for {key}: {exc}")
+            return None
+
+    async def set(self, key: str, value: bytes, expire: int) -> None:
+        if not self.enabled:
+            return
+        try:
+            await self._client.set(key, value, ex=expire)
+        except RedisError as exc:
+            logger.warning(f"Cache write failed for {key}: {exc}")
+
+    async def delete(self, key: str) -> None:
+        if not self.enabled:
+            return
+        try:
+            await self._client.unlink(key)
+        except RedisError as exc:
+            logger.warning(f"Cache invalidation failed for {key}: {exc}")
+
+    async def delete_pattern(self, pattern: str) -> None:
+        """Drop every key matching a glob pattern, e.g. ``supplier:*``."""
+        if not self.enabled:
+            return
+        try:
+            keys = [key async for key in self._client.scan_iter(match=pattern, count=500)]
+            if keys:
+                await self._client.unlink(*keys)
+        except RedisError as exc:
+            logger.warning(f"Cache invalidation failed for {pattern}: {exc}")
+
+
+cache = RedisCache()
+
+
+def invalidate_sync(pattern: str) -> None:
+    """Drop cached responses from synchronous code such as Celery tasks.
+
+    Tasks don't run inside the API's event loop, so they can't use the
+    ``cache`` singleton; this opens a short-lived blocking client instead.
+    """
+    client = redis.Redis.from_url(settings.REDIS_URL, password=settings.REDIS_PASSWORD)
+    try:
+        keys = list(client.scan_iter(match=pattern, count=500))
+        if keys:
+            client.unlink(*keys)
+    except RedisError as exc:
+        logger.warning(f"Cache invalidation failed for {pattern}: {exc}")
+    finally:
+        client.close()
+
+
+def cached(prefix: str, expire: int, model: Optional[Type[BaseModel]] = None) -> Callable:
+    """Cache the JSON body of a GET endpoint in Redis.
+
+    The key is built from the prefix, the endpoint name and its path/query
+    parameters; dependency parameters (db session, current user) are left
+    out, so only use this on endpoints whose response does not depend on
+    who is asking. Writers invalidate with ``cache.delete_pattern(f"{prefix}:*")``.
+
+    Endpoints may return their own JSON Response (e.g. from adapter_response());
+    otherwise the result is validated as ``model`` and serialized.
+    """
+    def decorator(func: Callable) -> Callable:
+        key_params = [
+            name for name, param in inspect.signature(func).parameters.items()
+            if not isinstance(param.default, Depends)
+        ]
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key = ":".join(
+                [prefix, func.__name__] + [f"{name}={kwargs.get(name)}" for name in key_params]
+            )
+
+            body = await cache.get(key)
+            if body is not None:
+                return Response(content=body, media_type="application/json")
+
+            result = await func(*args, **kwargs)
+            if isinstance(result, Response):
+                response = result
+            else:
+                if not isinstance(result, BaseModel):
+                    result = model.model_validate(result)
+                response = model_response(result)
+            await cache.set(key, response.body, expire)
+            return response
+
+        return wrapper
+
+    return decorator
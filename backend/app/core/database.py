@@ -2,18 +2,44 @@
 Database configuration and session management.
 """
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import asyncio
+import logging
+from sqlalchemy import DDL, Index, event
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
-from typing import AsyncGenerator
+from sqlalchemy.pool import NullPool
+from typing import AsyncGenerator, Optional
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+
+def _connect_args() -> dict:
+    """Driver-level connection arguments for the configured database."""
+    if not settings.DATABASE_URL.startswith("postgresql+asyncpg"):
+        return {}
+    
+    # Server-side prepared statements don't survive PgBouncer's transaction
+    # pooling, so disable them there and rely on SQLAlchemy's compiled cache
+    cache_size = 0 if settings.DATABASE_BEHIND_PGBOUNCER else settings.DATABASE_STATEMENT_CACHE_SIZE
+    return {
+        "statement_cache_size": cache_size,
+        "prepared_statement_cache_size": cache_size,
+    }
+
 
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
+    connect_args=_connect_args(),
+    query_cache_size=2000,
     pool_size=settings.DATABASE_POOL_SIZE,
     max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+    pool_recycle=settings.DATABASE_POOL_RECYCLE,
+    pool_pre_ping=True,  # survive idle disconnects (e.g. from PgBouncer)
     echo=settings.DEBUG,
 )
 
@@ -24,12 +50,71 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
+# Celery tasks run each job in a fresh event loop (asyncio.run), so pooled
+# connections bound to an earlier loop can't be reused; open one per task
+task_engine = create_async_engine(
+    settings.DATABASE_URL,
+    connect_args=_connect_args(),
+    poolclass=NullPool,
+)
+
+TaskSessionLocal = async_sessionmaker(
+    task_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+
+async def warm_pool() -> None:
+    """Open pool_size connections up front so early requests don't pay connect latency."""
+    results = await asyncio.gather(
+        *(engine.connect() for _ in range(settings.DATABASE_POOL_SIZE)),
+        return_exceptions=True,
+    )
+    
+    # Return every connection that did open, even if others failed; closing
+    # hands it back to the pool, which keeps it open for reuse
+    await asyncio.gather(
+        *(result.close() for result in results if isinstance(result, AsyncConnection))
+    )
+    
+    failures = [result for result in results if isinstance(result, BaseException)]
+    for failure in failures:
+        if not isinstance(failure, (OSError, SQLAlchemyError)):
+            raise failure
+    if failures:
+        logger.warning(
+            f"Database pool pre-warm failed for {len(failures)} of {len(results)} connections: {failures[0]}"
+        )
+
 
 class Base(DeclarativeBase):
     """Base class for all database models."""
     pass
 
 
+# Trigram indexes back the ilike '%term%' search filters; they need pg_trgm
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+def trigram_index(name: str, column: str) -> Index:
+    """GIN trigram index on a text column (a plain index on other dialects)."""
+    return Index(name, column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"})
+
+
+def violated_constraint(exc: IntegrityError) -> Optional[str]:
+    """Name of the constraint or unique index an IntegrityError violated.
+    
+    asyncpg reports it on the driver exception the DBAPI error wraps; other
+    drivers (e.g. SQLite in the tests) give None.
+    """
+    return getattr(exc.orig.__cause__, "constraint_name", None)
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency to get database session.
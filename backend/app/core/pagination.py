@@ -0,0 +1,54 @@
+"""
+Keyset (cursor) pagination helpers.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor."""
+    payload = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str, *types: type) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor into its sort key values.
+    
+    ``types`` gives the expected type of each value; datetimes are parsed
+    back from their ISO form. Anything else is rejected with a 400.
+    """
+    invalid_cursor = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor"
+    )
+
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise invalid_cursor
+
+    if not isinstance(values, list) or len(values) != len(types):
+        raise invalid_cursor
+
+    for i, (value, expected) in enumerate(zip(values, types)):
+        if expected is datetime:
+            if not isinstance(value, str):
+                raise invalid_cursor
+            try:
+                values[i] = datetime.fromisoformat(value)
+            except ValueError:
+                raise invalid_cursor
+        # bool is an int subclass, but never a valid key
+        elif not isinstance(value, expected) or isinstance(value, bool):
+            raise invalid_cursor
+
+    return values
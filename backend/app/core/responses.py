@@ -0,0 +1,55 @@
+"""
+Response helpers for endpoints that build their response models themselves.
+"""
+
+from typing import Any, AsyncIterator, Sequence
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+
+
+def model_response(model: BaseModel) -> Response:
+    """Serialize an already-validated response model straight to JSON.
+
+    Returning a model from an endpoint makes FastAPI dump it to a dict,
+    validate that against response_model again and then encode it. When the
+    endpoint has just built the model itself, pydantic's Rust serializer
+    can emit the final bytes in one step instead.
+    """
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+
+def adapter_response(adapter: TypeAdapter, data: Any) -> Response:
+    """Validate rows or ORM objects with a prebuilt TypeAdapter and emit JSON.
+
+    The list-typed counterpart of model_response(): the whole list is
+    validated and serialized by pydantic-core in one call each, instead of
+    building a model per row in Python and re-validating the result.
+    """
+    return Response(content=adapter.dump_json(adapter.validate_python(data)), media_type="application/json")
+
+
+def adapter_stream_response(adapter: TypeAdapter, partitions: AsyncIterator[Sequence[Any]]) -> StreamingResponse:
+    """Stream a JSON array built partition by partition from a streamed result.
+
+    ``adapter`` must be a list TypeAdapter. Each partition (e.g. from
+    ``(await db.stream(stmt)).mappings().partitions()``) is validated and
+    dumped on its own, so memory stays bounded by the partition size however
+    many rows the query returns.
+    """
+    async def body() -> AsyncIterator[bytes]:
+        yield b"["
+        first = True
+        async for partition in partitions:
+            # Drop the brackets of each partition's array and splice the items in
+            chunk = adapter.dump_json(adapter.validate_python(partition))[1:-1]
+            if not chunk:
+                continue
+            if not first:
+                yield b","
+            first = False
+            yield chunk
+        yield b"]"
+
+    return StreamingResponse(body(), media_type="application/json")
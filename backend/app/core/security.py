@@ -2,70 +2,199 @@
 Security utilities for authentication and authorization.
 """
 
-from datetime import datetime, timedelta
-from typing import Optional, Union
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import asyncio
+import hashlib
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple, Union
+import bcrypt
+import jwt
+import orjson
+from argon2 import PasswordHasher, Type
+from argon2.exceptions import InvalidHashError, VerificationError
+from cachetools import TTLCache
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from jwt import InvalidTokenError
+from sqlalchemy import select, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import cache
 from app.core.config import settings
+from app.models.user import User, UserRole
 from app.schemas.user import TokenData
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing: new hashes use Argon2id, existing bcrypt hashes still
+# verify and are upgraded on the next successful login. The hash libraries
+# are called directly; the "$2" prefix identifies a legacy bcrypt hash.
+password_hasher = PasswordHasher(
+    time_cost=2,
+    memory_cost=19456,  # 19 MiB
+    parallelism=1,
+    type=Type.ID,
+)
 
 # JWT token security
 security = HTTPBearer()
 
+# Token settings are fixed for the life of the process
+_SECRET_KEY = settings.SECRET_KEY
+_ALGORITHM = "HS256"
+_ACCESS_TOKEN_TTL = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+_REFRESH_TOKEN_TTL = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+_SELECT_USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+
+# Verified TokenData of recent tokens, keyed by (token digest, token type).
+# Only successful verifications are stored; entries are re-checked
+# against the token's own "exp" claim on every hit.
+_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=settings.AUTH_CACHE_TTL)
+
+# Lightweight snapshots of user rows for the auth endpoints live in Redis,
+# shared by all API workers, so a role or status change invalidates them
+# everywhere at once. The TTL only bounds staleness if an invalidation is lost.
+_USER_CACHE_PREFIX = "auth_user"
+_USER_CACHE_TTL = 60
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Read-only snapshot of the user fields needed by the auth endpoints."""
+    id: int
+    username: str
+    email: str
+    full_name: str
+    role: UserRole
+    is_active: bool
+    is_verified: bool
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    last_login: Optional[datetime] = None
+
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Check a password, returning a new Argon2id hash if the stored one is outdated."""
+    if hashed_password.startswith("$2"):
+        if bcrypt.checkpw(plain_password.encode(), hashed_password.encode()):
+            return True, get_password_hash(plain_password)
+        return False, None
+    
+    try:
+        password_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False, None
+    
+    if password_hasher.check_needs_rehash(hashed_password):
+        return True, get_password_hash(plain_password)
+    return True, None
+
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and return a replacement hash if it uses outdated parameters."""
+    return await asyncio.to_thread(_verify_and_update, plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Generate password hash."""
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
+
+
+async def hash_password_async(password: str) -> str:
+    """Generate password hash without blocking the event loop."""
+    return await asyncio.to_thread(password_hasher.hash, password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token."""
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    expire = datetime.now(timezone.utc) + (expires_delta or _ACCESS_TOKEN_TTL)
     
     to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
+    encoded_jwt = jwt.encode(to_encode, _SECRET_KEY, algorithm=_ALGORITHM)
     return encoded_jwt
 
 
 def create_refresh_token(data: dict) -> str:
     """Create JWT refresh token."""
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    expire = datetime.now(timezone.utc) + _REFRESH_TOKEN_TTL
     to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
+    encoded_jwt = jwt.encode(to_encode, _SECRET_KEY, algorithm=_ALGORITHM)
     return encoded_jwt
 
 
 def verify_token(token: str, token_type: str = "access") -> Optional[TokenData]:
-    """Verify and decode JWT token."""
+    """Verify and decode JWT token, reusing results for recently verified tokens."""
+    # The expected type is part of the key, so a token cached as an access
+    # token can never be served back from a refresh-token lookup
+    cache_key = (hashlib.sha256(token.encode()).digest()[:16], token_type)
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        token_data, exp_ts = cached
+        if exp_ts is None or exp_ts > time.time():
+            return token_data
+        _token_cache.pop(cache_key, None)
+    
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-        username: str = payload.get("sub")
-        user_id: int = payload.get("user_id")
-        role: str = payload.get("role")
-        token_type_claim: str = payload.get("type")
-        
-        if username is None or user_id is None or token_type_claim != token_type:
-            return None
-            
-        return TokenData(username=username, user_id=user_id, role=role)
-    except JWTError:
+        payload = jwt.decode(token, _SECRET_KEY, algorithms=[_ALGORITHM])
+    except InvalidTokenError:
+        return None
+    
+    username: str = payload.get("sub")
+    user_id: int = payload.get("user_id")
+    role: str = payload.get("role")
+    token_type_claim: str = payload.get("type")
+    
+    if username is None or user_id is None or token_type_claim != token_type:
+        return None
+    
+    token_data = TokenData(username=username, user_id=user_id, role=role)
+    _token_cache[cache_key] = (token_data, payload.get("exp"))
+    return token_data
+
+
+def _decode_cached_user(body: bytes) -> CachedUser:
+    """Rebuild a CachedUser from its cached JSON form."""
+    data = orjson.loads(body)
+    data["role"] = UserRole(data["role"])
+    for name in ("created_at", "updated_at", "last_login"):
+        if data[name] is not None:
+            data[name] = datetime.fromisoformat(data[name])
+    return CachedUser(**data)
+
+
+async def get_user_cached(db: AsyncSession, user_id: int) -> Optional[CachedUser]:
+    """Get a user snapshot by ID, hitting the database only on cache misses."""
+    key = f"{_USER_CACHE_PREFIX}:{user_id}"
+    body = await cache.get(key)
+    if body is not None:
+        return _decode_cached_user(body)
+    
+    result = await db.execute(_SELECT_USER_BY_ID, {"user_id": user_id})
+    user = result.scalar_one_or_none()
+    if user is None:
         return None
+    
+    cached = CachedUser(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        full_name=user.full_name,
+        role=user.role,
+        is_active=user.is_active,
+        is_verified=user.is_verified,
+        created_at=user.created_at,
+        updated_at=user.updated_at,
+        last_login=user.last_login,
+    )
+    await cache.set(key, orjson.dumps(asdict(cached)), _USER_CACHE_TTL)
+    return cached
+
+
+async def invalidate_user_cache(user_id: int) -> None:
+    """Drop a cached user snapshot after the underlying row changes."""
+    await cache.delete(f"{_USER_CACHE_PREFIX}:{user_id}")
 
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> TokenData:
@@ -83,34 +212,40 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     return token_data
 
 
+# Role levels for hierarchical permission checks
+_ROLE_LEVEL = {
+    "staff": 1,
+    "manager": 2,
+    "admin": 3
+}
+
+
+def _check_role_level(current_user: TokenData, required_level: int) -> TokenData:
+    """Raise 403 unless the user's role is at or above the required level."""
+    if _ROLE_LEVEL.get(current_user.role, 0) < required_level:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Insufficient permissions"
+        )
+    
+    return current_user
+
+
 def require_role(required_role: str):
     """Decorator to require specific user role."""
+    required_level = _ROLE_LEVEL.get(required_role, 0)
+    
     def role_checker(current_user: TokenData = Depends(get_current_user)) -> TokenData:
-        role_hierarchy = {
-            "staff": 1,
-            "manager": 2,
-            "admin": 3
-        }
-        
-        user_role_level = role_hierarchy.get(current_user.role, 0)
-        required_role_level = role_hierarchy.get(required_role, 0)
-        
-        if user_role_level < required_role_level:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Insufficient permissions"
-            )
-        
-        return current_user
+        return _check_role_level(current_user, required_level)
     
     return role_checker
 
 
 def require_admin(current_user: TokenData = Depends(get_current_user)) -> TokenData:
     """Require admin role."""
-    return require_role("admin")(current_user)
+    return _check_role_level(current_user, _ROLE_LEVEL["admin"])
 
 
 def require_manager(current_user: TokenData = Depends(get_current_user)) -> TokenData:
     """Require manager or admin role."""
-    return require_role("manager")(current_user)
+    return _check_role_level(current_user, _ROLE_LEVEL["manager"])
@@ -2,17 +2,22 @@
 Main FastAPI application entry point for the Minimum Inventory Management System.
 """
 
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer
 import uvicorn
 import sentry_sdk
 from sentry_sdk.integrations.fastapi import FastApiIntegration
 from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
 
+from app.core.cache import cache
 from app.core.config import settings
-from app.core.database import engine, get_db
+from app.core.database import engine, get_db, warm_pool
 from app.api.v1.api import api_router
 from app.core.exceptions import setup_exception_handlers
 
@@ -28,6 +33,15 @@ if settings.SENTRY_DSN:
         environment=settings.ENVIRONMENT,
     )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared connection pools on startup and release them on shutdown."""
+    await warm_pool()
+    await cache.connect(settings.REDIS_URL, password=settings.REDIS_PASSWORD, max_connections=20)
+    yield
+    await cache.close()
+    await engine.dispose()
+
 # Create FastAPI application
 app = FastAPI(
     title="Minimum Inventory Management System",
@@ -36,24 +50,31 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # Security
 security = HTTPBearer()
 
 # Add middleware
+allow_any_host = "*" in settings.ALLOWED_HOSTS
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.ALLOWED_HOSTS,
-    allow_credentials=True,
+    allow_origins=["*"] if allow_any_host else settings.ALLOWED_HOSTS,
+    # Browsers refuse credentialed responses to a wildcard origin
+    allow_credentials=not allow_any_host,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-app.add_middleware(
-    TrustedHostMiddleware,
-    allowed_hosts=settings.ALLOWED_HOSTS,
-)
+# A wildcard host list would accept every request, so skip the per-request check
+if not allow_any_host:
+    app.add_middleware(
+        TrustedHostMiddleware,
+        allowed_hosts=settings.ALLOWED_HOSTS,
+    )
 
 # Setup exception handlers
 setup_exception_handlers(app)
@@ -81,10 +102,17 @@ async def health_check():
     }
 
 if __name__ == "__main__":
+    # uvloop and httptools ship with uvicorn[standard]. WEB_CONCURRENCY sets
+    # the worker count (each worker has its own database pool); uvicorn
+    # ignores it while reload is on, so reload is limited to development.
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=settings.DEBUG,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+        reload=settings.DEBUG and settings.ENVIRONMENT == "development",
+        backlog=4096,
         log_level="info"
     )
@@ -2,8 +2,9 @@
 Inventory item model for managing stock and product information.
 """
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Numeric, ForeignKey, Enum
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Numeric, ForeignKey, Enum, Index, DDL, desc, event
+from sqlalchemy.sql import column, func, table, text
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 import enum
 
@@ -32,6 +33,23 @@ class InventoryItem(Base):
     """Inventory item model for managing products and stock."""
     
     __tablename__ = "inventory_items"
+    __table_args__ = (
+        # Category-filtered list pages ordered by name
+        Index("ix_inventory_items_category_name", "category", "name"),
+        # Partial index covering only low-stock rows; the predicate must match
+        # the low-stock filters in the inventory endpoints for the planner to use it.
+        # The included columns are everything the alert list and low-stock
+        # report read, so they can be answered by an index-only scan
+        Index(
+            "ix_inventory_items_low_stock",
+            "name",
+            postgresql_where=text("quantity_in_stock <= reorder_point"),
+            postgresql_include=[
+                "id", "sku", "quantity_in_stock", "reorder_point",
+                "minimum_stock_level", "supplier_id", "is_tracked",
+            ],
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     sku = Column(String(100), unique=True, index=True, nullable=False)
@@ -57,7 +75,7 @@ class InventoryItem(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Foreign keys
-    supplier_id = Column(Integer, ForeignKey("suppliers.id"), nullable=True)
+    supplier_id = Column(Integer, ForeignKey("suppliers.id"), nullable=True, index=True)
     
     # Relationships
     supplier = relationship("Supplier", back_populates="items")
@@ -67,12 +85,15 @@ class InventoryItem(Base):
     def __repr__(self):
         return f"<InventoryItem(id={self.id}, sku='{self.sku}', name='{self.name}')>"
     
-    @property
+    # Hybrids: plain attribute checks on loaded items, SQL expressions in
+    # queries (e.g. .where(InventoryItem.is_low_stock)). is_low_stock renders
+    # the predicate of ix_inventory_items_low_stock.
+    @hybrid_property
     def is_low_stock(self) -> bool:
         """Check if item is below reorder point."""
         return self.quantity_in_stock <= self.reorder_point
     
-    @property
+    @hybrid_property
     def is_out_of_stock(self) -> bool:
         """Check if item is out of stock."""
         return self.quantity_in_stock <= 0
@@ -82,6 +103,10 @@ class InventoryUpdate(Base):
     """Model for tracking inventory changes and stock movements."""
     
     __tablename__ = "inventory_updates"
+    __table_args__ = (
+        # Per-item history, newest first
+        Index("ix_inventory_updates_item_id_created_at", "item_id", desc("created_at")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     item_id = Column(Integer, ForeignKey("inventory_items.id"), nullable=False)
@@ -101,3 +126,41 @@ class InventoryUpdate(Base):
     
     def __repr__(self):
         return f"<InventoryUpdate(id={self.id}, item_id={self.item_id}, change={self.quantity_change})>"
+
+
+# Stock value per category, precomputed for reports and refreshed on a
+# schedule (see refresh_inventory_value_rollup); not part of the ORM metadata.
+# The DDL below covers databases built with create_all; existing databases
+# get the view and its index from migration 0910b88dddd0
+inventory_value_by_category = table(
+    "inventory_value_by_category",
+    column("category", Enum(ItemCategory)),
+    column("value", Numeric(15, 2)),
+    column("item_count", Integer),
+)
+
+event.listen(
+    InventoryItem.__table__,
+    "after_create",
+    DDL(
+        "CREATE MATERIALIZED VIEW IF NOT EXISTS inventory_value_by_category AS "
+        "SELECT category, "
+        "SUM(quantity_in_stock * COALESCE(cost_price, unit_price)) AS value, "
+        "COUNT(*) AS item_count "
+        "FROM inventory_items GROUP BY category"
+    ).execute_if(dialect="postgresql"),
+)
+# A unique index lets the view be refreshed CONCURRENTLY
+event.listen(
+    InventoryItem.__table__,
+    "after_create",
+    DDL(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_inventory_value_by_category_category "
+        "ON inventory_value_by_category (category)"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    InventoryItem.__table__,
+    "before_drop",
+    DDL("DROP MATERIALIZED VIEW IF EXISTS inventory_value_by_category").execute_if(dialect="postgresql"),
+)
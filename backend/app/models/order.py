@@ -2,7 +2,7 @@
 Order models for managing purchase orders and sales orders.
 """
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Numeric, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Numeric, ForeignKey, Enum, Sequence, Index, DDL, FetchedValue, desc, event
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -29,13 +29,29 @@ class OrderStatus(str, enum.Enum):
     RETURNED = "returned"
 
 
+# Feeds server-generated order numbers, e.g. "ORD-20240131-000042"
+order_number_seq = Sequence("order_number_seq", metadata=Base.metadata)
+
+
 class Order(Base):
     """Order model for managing purchase and sales orders."""
     
     __tablename__ = "orders"
+    __table_args__ = (
+        # Filtered list pages ordered by newest first
+        Index("ix_orders_status_order_date", "status", desc("order_date")),
+        Index("ix_orders_order_type_order_date", "order_type", desc("order_date")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    order_number = Column(String(100), unique=True, index=True, nullable=False)
+    order_number = Column(
+        String(100),
+        unique=True,
+        index=True,
+        nullable=False,
+        # Generated by the database; the default is PostgreSQL-only DDL (below)
+        server_default=FetchedValue(),
+    )
     order_type = Column(Enum(OrderType), nullable=False)
     status = Column(Enum(OrderStatus), default=OrderStatus.PENDING, nullable=False)
     
@@ -70,10 +86,11 @@ class Order(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
-    # Relationships
+    # Relationships; order items are part of every Order response (and of the
+    # delete cascade), so they are always loaded with one extra IN query
     user = relationship("User", back_populates="orders")
     supplier = relationship("Supplier", back_populates="orders")
-    order_items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
+    order_items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan", lazy="selectin")
     
     def __repr__(self):
         return f"<Order(id={self.id}, order_number='{self.order_number}', type='{self.order_type}')>"
@@ -85,7 +102,7 @@ class OrderItem(Base):
     __tablename__ = "order_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
     item_id = Column(Integer, ForeignKey("inventory_items.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
     unit_price = Column(Numeric(10, 2), nullable=False)
@@ -98,3 +115,17 @@ class OrderItem(Base):
     
     def __repr__(self):
         return f"<OrderItem(id={self.id}, order_id={self.order_id}, item_id={self.item_id}, qty={self.quantity})>"
+
+
+# nextval() and to_char() only exist on PostgreSQL, so the default is added
+# there alone; elsewhere (e.g. the SQLite test database) order_number must
+# be given explicitly. Existing databases get it from the migrations.
+event.listen(
+    Order.__table__,
+    "after_create",
+    DDL(
+        "ALTER TABLE orders ALTER COLUMN order_number SET DEFAULT "
+        "('ORD-' || to_char(now(), 'YYYYMMDD') || '-' || "
+        "lpad(CAST(nextval('order_number_seq') AS TEXT), 6, '0'))"
+    ).execute_if(dialect="postgresql"),
+)
@@ -6,16 +6,22 @@ from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Numeric
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
-from app.core.database import Base
+from app.core.database import Base, trigram_index
 
 
 class Supplier(Base):
     """Supplier model for managing vendor information."""
     
     __tablename__ = "suppliers"
+    __table_args__ = (
+        # Substring search in the supplier list
+        trigram_index("ix_suppliers_name_trgm", "name"),
+        trigram_index("ix_suppliers_contact_person_trgm", "contact_person"),
+        trigram_index("ix_suppliers_email_trgm", "email"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(255), nullable=False, index=True)
+    name = Column(String(255), unique=True, nullable=False, index=True)
     contact_person = Column(String(255))
     email = Column(String(255), index=True)
     phone = Column(String(50))
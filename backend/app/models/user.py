@@ -2,12 +2,12 @@
 User model for authentication and authorization.
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
 
-from app.core.database import Base
+from app.core.database import Base, trigram_index
 
 
 class UserRole(str, enum.Enum):
@@ -17,10 +17,25 @@ class UserRole(str, enum.Enum):
     STAFF = "staff"
 
 
+# Unique indexes on users, and the field each one guards (for error messages)
+USER_UNIQUE_FIELDS = {
+    "ix_users_email": "Email",
+    "ix_users_username": "Username",
+}
+
+
 class User(Base):
     """User model for authentication and role-based access control."""
     
     __tablename__ = "users"
+    __table_args__ = (
+        # Substring search in the user list
+        trigram_index("ix_users_username_trgm", "username"),
+        trigram_index("ix_users_email_trgm", "email"),
+        trigram_index("ix_users_full_name_trgm", "full_name"),
+        # Default user list: active users, optionally by role, ordered by name
+        Index("ix_users_active_role_full_name", "role", "full_name", postgresql_where=text("is_active")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, index=True, nullable=False)
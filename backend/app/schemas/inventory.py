@@ -5,7 +5,7 @@ Pydantic schemas for inventory-related API endpoints.
 from typing import Optional, List
 from datetime import datetime
 from decimal import Decimal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 from app.models.inventory import ItemCategory, ItemStatus
 
 
@@ -69,17 +69,33 @@ class InventoryItem(InventoryItemBase):
     is_low_stock: bool
     is_out_of_stock: bool
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class InventoryItemListRow(BaseModel):
+    """Schema for an inventory item row in list responses."""
+    id: int
+    sku: str
+    name: str
+    category: ItemCategory
+    unit_price: Decimal
+    quantity_in_stock: int
+    reorder_point: int
+    status: ItemStatus
+    supplier_name: Optional[str] = None
+    
+    model_config = ConfigDict(from_attributes=True)
 
 
 class InventoryItemList(BaseModel):
     """Schema for paginated inventory item list response."""
-    items: List[InventoryItem]
-    total: int
-    page: int
+    items: List[InventoryItemListRow]
+    # total, page and pages are only set for offset pagination
+    total: Optional[int] = None
+    page: Optional[int] = None
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class StockAdjustment(BaseModel):
@@ -105,8 +121,7 @@ class InventoryUpdate(BaseModel):
     notes: Optional[str] = None
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class LowStockAlert(BaseModel):
@@ -119,5 +134,9 @@ class LowStockAlert(BaseModel):
     minimum_stock_level: int
     supplier_name: Optional[str] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Built once at import; used by list endpoints through adapter_response()
+LowStockAlertListAdapter = TypeAdapter(List[LowStockAlert])
+InventoryUpdateListAdapter = TypeAdapter(List[InventoryUpdate])
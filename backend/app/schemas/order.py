@@ -5,7 +5,7 @@ Pydantic schemas for order-related API endpoints.
 from typing import Optional, List
 from datetime import datetime
 from decimal import Decimal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from app.models.order import OrderType, OrderStatus
 
 
@@ -34,8 +34,7 @@ class OrderItem(OrderItemBase):
     id: int
     total_price: Decimal
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class OrderBase(BaseModel):
@@ -90,17 +89,34 @@ class Order(OrderBase):
     updated_at: Optional[datetime] = None
     order_items: List[OrderItem] = []
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OrderListRow(BaseModel):
+    """Schema for an order row in list responses."""
+    id: int
+    order_number: str
+    order_type: OrderType
+    status: OrderStatus
+    total_amount: Decimal
+    order_date: datetime
+    expected_delivery_date: Optional[datetime] = None
+    tracking_number: Optional[str] = None
+    supplier_name: Optional[str] = None
+    user_id: int
+    
+    model_config = ConfigDict(from_attributes=True)
 
 
 class OrderList(BaseModel):
     """Schema for paginated order list response."""
-    orders: List[Order]
-    total: int
-    page: int
+    orders: List[OrderListRow]
+    # total, page and pages are only set for offset pagination
+    total: Optional[int] = None
+    page: Optional[int] = None
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 
 class OrderSummary(BaseModel):
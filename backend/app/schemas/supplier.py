@@ -5,7 +5,7 @@ Pydantic schemas for supplier-related API endpoints.
 from typing import Optional
 from datetime import datetime
 from decimal import Decimal
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 
 class SupplierBase(BaseModel):
@@ -55,14 +55,15 @@ class Supplier(SupplierBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class SupplierList(BaseModel):
     """Schema for paginated supplier list response."""
     suppliers: list[Supplier]
-    total: int
-    page: int
+    # total, page and pages are only set for offset pagination
+    total: Optional[int] = None
+    page: Optional[int] = None
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
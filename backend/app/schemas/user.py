@@ -4,7 +4,7 @@ Pydantic schemas for user-related API endpoints.
 
 from typing import Optional
 from datetime import datetime
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from app.models.user import UserRole
 
 
@@ -41,8 +41,7 @@ class UserInDB(UserBase):
     updated_at: Optional[datetime] = None
     last_login: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class User(UserBase):
@@ -53,8 +52,7 @@ class User(UserBase):
     updated_at: Optional[datetime] = None
     last_login: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserLogin(BaseModel):
@@ -80,7 +78,14 @@ class TokenData(BaseModel):
 class UserList(BaseModel):
     """Schema for paginated user list response."""
     users: list[User]
-    total: int
-    page: int
+    # total, page and pages are only set for offset pagination
+    total: Optional[int] = None
+    page: Optional[int] = None
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class UserTaskAccepted(BaseModel):
+    """Schema for a user creation queued with ``?async=1``."""
+    task_id: str
@@ -3,49 +3,52 @@ Email-related background tasks.
 """
 
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import List, Dict, Any
+from email.message import EmailMessage
+from typing import List, Dict, Any, Optional, Tuple, Union
 from celery import current_task
 
 from app.core.celery_app import celery_app
 from app.core.config import settings
 
 
+def _low_stock_message(alert_data: Dict[str, Any]) -> Tuple[str, str]:
+    """Build the subject and body of a low stock alert email."""
+    subject = f"Low Stock Alert: {alert_data['item_name']}"
+    body = f"""
+    Low Stock Alert
+    
+    Item: {alert_data['item_name']}
+    SKU: {alert_data['sku']}
+    Current Stock: {alert_data['current_stock']}
+    Reorder Point: {alert_data['reorder_point']}
+    Minimum Stock Level: {alert_data['minimum_stock_level']}
+    Supplier: {alert_data.get('supplier_name', 'N/A')}
+    
+    Please reorder this item as soon as possible.
+    """
+    return subject, body
+
+
 @celery_app.task(bind=True)
-def send_low_stock_alert(self, alert_data: Dict[str, Any]):
-    """Send low stock alert email to managers."""
+def send_low_stock_alert(self, alerts: Union[List[Dict[str, Any]], Dict[str, Any]]):
+    """
+    Send low stock alert emails to managers.
+    
+    Accepts a list of alerts (or a single alert); all of them are sent over
+    one SMTP connection.
+    """
+    if isinstance(alerts, dict):
+        alerts = [alerts]
+    
     try:
-        # Update task status
-        current_task.update_state(
-            state="PROGRESS",
-            meta={"message": "Preparing low stock alert email"}
-        )
-        
-        # Create email content
-        subject = f"Low Stock Alert: {alert_data['item_name']}"
-        body = f"""
-        Low Stock Alert
-        
-        Item: {alert_data['item_name']}
-        SKU: {alert_data['sku']}
-        Current Stock: {alert_data['current_stock']}
-        Reorder Point: {alert_data['reorder_point']}
-        Minimum Stock Level: {alert_data['minimum_stock_level']}
-        Supplier: {alert_data.get('supplier_name', 'N/A')}
-        
-        Please reorder this item as soon as possible.
-        """
-        
-        # Send email if SMTP is configured
+        # Send emails if SMTP is configured
         if settings.SMTP_HOST:
-            send_email(
-                to=settings.SMTP_USER,
-                subject=subject,
-                body=body
-            )
+            with SmtpSender() as sender:
+                for alert_data in alerts:
+                    subject, body = _low_stock_message(alert_data)
+                    sender.send(to=settings.SMTP_USER, subject=subject, body=body)
         
-        return {"status": "success", "message": "Low stock alert sent"}
+        return {"status": "success", "message": f"Sent {len(alerts)} low stock alerts"}
         
     except Exception as exc:
         # Update task state with error
@@ -60,11 +63,6 @@ def send_low_stock_alert(self, alert_data: Dict[str, Any]):
 def send_order_notification(self, order_data: Dict[str, Any], notification_type: str):
     """Send order-related notification emails."""
     try:
-        current_task.update_state(
-            state="PROGRESS",
-            meta={"message": f"Preparing {notification_type} notification"}
-        )
-        
         if notification_type == "order_created":
             subject = f"New Order Created: {order_data['order_number']}"
             body = f"""
@@ -103,25 +101,53 @@ def send_order_notification(self, order_data: Dict[str, Any], notification_type:
         raise
 
 
-def send_email(to: str, subject: str, body: str):
-    """Send email using SMTP."""
-    if not settings.SMTP_HOST:
-        return
+class SmtpSender:
+    """
+    One SMTP session for sending several emails.
+    
+    Connecting, STARTTLS and login happen once on enter, QUIT on exit:
     
-    msg = MIMEMultipart()
-    msg["From"] = settings.SMTP_USER
-    msg["To"] = to
-    msg["Subject"] = subject
+        with SmtpSender() as sender:
+            sender.send(to, subject, body)
+    """
     
-    msg.attach(MIMEText(body, "plain"))
+    def __init__(self):
+        self._server: Optional[smtplib.SMTP] = None
     
-    server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT)
-    if settings.SMTP_TLS:
-        server.starttls()
+    def __enter__(self) -> "SmtpSender":
+        self._server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT)
+        try:
+            if settings.SMTP_TLS:
+                self._server.starttls()
+            
+            if settings.SMTP_USER and settings.SMTP_PASSWORD:
+                self._server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        except Exception:
+            self._server.close()
+            raise
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self._server.quit()
+        except smtplib.SMTPException:
+            self._server.close()
+        self._server = None
     
-    if settings.SMTP_USER and settings.SMTP_PASSWORD:
-        server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+    def send(self, to: str, subject: str, body: str) -> None:
+        msg = EmailMessage()
+        msg["From"] = settings.SMTP_USER
+        msg["To"] = to
+        msg["Subject"] = subject
+        msg.set_content(body)
+        
+        self._server.send_message(msg)
+
+
+def send_email(to: str, subject: str, body: str):
+    """Send a single email using SMTP."""
+    if not settings.SMTP_HOST:
+        return
     
-    text = msg.as_string()
-    server.sendmail(settings.SMTP_USER, to, text)
-    server.quit()
+    with SmtpSender() as sender:
+        sender.send(to=to, subject=subject, body=body)
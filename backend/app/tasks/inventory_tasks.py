@@ -2,32 +2,54 @@
 Inventory-related background tasks.
 """
 
+import asyncio
+from collections import defaultdict
 from typing import List, Dict, Any
 from celery import current_task
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, values, column, text, Integer
 
+from app.core.cache import invalidate_sync
 from app.core.celery_app import celery_app
-from app.core.database import AsyncSessionLocal
-from app.models.inventory import InventoryItem
+from app.core.database import AsyncSessionLocal, TaskSessionLocal, task_engine
+from app.models.inventory import InventoryItem, InventoryUpdate
+from app.models.supplier import Supplier
 from app.tasks.email_tasks import send_low_stock_alert
 
 
+async def _fetch_low_stock_alerts() -> List[Dict[str, Any]]:
+    """Read alert payloads for tracked items at or below their reorder point."""
+    # is_low_stock renders the predicate of ix_inventory_items_low_stock, so only
+    # the low-stock rows are read instead of scanning the whole table
+    stmt = select(
+        InventoryItem.id.label("item_id"),
+        InventoryItem.name.label("item_name"),
+        InventoryItem.sku,
+        InventoryItem.quantity_in_stock.label("current_stock"),
+        InventoryItem.reorder_point,
+        InventoryItem.minimum_stock_level,
+        Supplier.name.label("supplier_name")
+    ).outerjoin(
+        Supplier, Supplier.id == InventoryItem.supplier_id
+    ).where(
+        InventoryItem.is_low_stock,
+        InventoryItem.is_tracked.is_(True)
+    )
+    
+    async with TaskSessionLocal() as session:
+        result = await session.execute(stmt)
+        return [dict(row) for row in result.mappings().all()]
+
+
 @celery_app.task(bind=True)
 def check_low_stock_items(self):
     """Check for low stock items and send alerts."""
     try:
-        current_task.update_state(
-            state="PROGRESS",
-            meta={"message": "Checking for low stock items"}
-        )
-        
-        # This would typically be run in an async context
-        # For now, we'll create a synchronous version
-        alerts_sent = 0
-        
-        # In a real implementation, you'd use an async database session
-        # and check all items for low stock conditions
+        alerts = asyncio.run(_fetch_low_stock_alerts())
+        if alerts:
+            # One task sends every alert over a single SMTP connection
+            send_low_stock_alert.delay(alerts)
+        alerts_sent = len(alerts)
         
         return {
             "status": "success",
@@ -46,11 +68,6 @@ def check_low_stock_items(self):
 def update_inventory_metrics(self):
     """Update inventory metrics and statistics."""
     try:
-        current_task.update_state(
-            state="PROGRESS",
-            meta={"message": "Updating inventory metrics"}
-        )
-        
         # Calculate various inventory metrics
         # - Total inventory value
         # - Items below reorder point
@@ -78,30 +95,108 @@ def update_inventory_metrics(self):
         raise
 
 
-@celery_app.task(bind=True)
-def process_stock_adjustment(self, adjustment_data: Dict[str, Any]):
-    """Process stock adjustment and update inventory."""
-    try:
-        current_task.update_state(
-            state="PROGRESS",
-            meta={"message": "Processing stock adjustment"}
-        )
+async def _apply_stock_adjustments(adjustments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply a batch of stock adjustments with one UPDATE and one INSERT."""
+    # Net change per item, and the lowest point its running total reaches
+    # relative to the starting stock (0 if it never dips below it)
+    deltas: Dict[int, int] = defaultdict(int)
+    lowest: Dict[int, int] = defaultdict(int)
+    for adjustment in adjustments:
+        item_id = adjustment["item_id"]
+        deltas[item_id] += adjustment["quantity_change"]
+        lowest[item_id] = min(lowest[item_id], deltas[item_id])
+    
+    async with TaskSessionLocal() as session:
+        # Net change per tracked item in a single UPDATE ... FROM (VALUES ...).
+        # Items whose stock would go negative at any step, not just at the
+        # end, are left untouched, so every audit row below stays non-negative
+        changes = values(
+            column("item_id", Integer), column("delta", Integer), column("lowest", Integer), name="changes"
+        ).data([(item_id, delta, lowest[item_id]) for item_id, delta in deltas.items()])
+        stmt = update(InventoryItem).where(
+            InventoryItem.id == changes.c.item_id,
+            InventoryItem.is_tracked.is_(True),
+            InventoryItem.quantity_in_stock + changes.c.lowest >= 0
+        ).values(
+            quantity_in_stock=InventoryItem.quantity_in_stock + changes.c.delta
+        ).returning(
+            InventoryItem.id, InventoryItem.quantity_in_stock
+        ).execution_options(synchronize_session=False)
+        result = await session.execute(stmt)
+        new_quantities = dict(result.all())
         
-        # Process the stock adjustment
-        # This would typically involve:
-        # 1. Validating the adjustment
-        # 2. Updating the inventory item
-        # 3. Creating an inventory update record
-        # 4. Sending notifications if needed
-        
-        return {
-            "status": "success",
-            "message": "Stock adjustment processed successfully"
+        # One audit row per adjustment, replaying each item's running total
+        running = {
+            item_id: new_quantity - deltas[item_id]
+            for item_id, new_quantity in new_quantities.items()
         }
+        updates = []
+        for adjustment in adjustments:
+            item_id = adjustment["item_id"]
+            if item_id not in running:
+                continue
+            previous_quantity = running[item_id]
+            running[item_id] += adjustment["quantity_change"]
+            updates.append({
+                "item_id": item_id,
+                "user_id": adjustment["user_id"],
+                "change_type": adjustment["reason"],
+                "quantity_change": adjustment["quantity_change"],
+                "previous_quantity": previous_quantity,
+                "new_quantity": running[item_id],
+                "reason": adjustment["reason"],
+                "reference_number": adjustment.get("reference_number"),
+                "notes": adjustment.get("notes"),
+            })
+        if updates:
+            await session.execute(insert(InventoryUpdate), updates)
         
-    except Exception as exc:
-        current_task.update_state(
-            state="FAILURE",
-            meta={"error": str(exc)}
-        )
-        raise
+        await session.commit()
+    
+    return {
+        "updated_items": sorted(new_quantities),
+        "skipped_items": sorted(set(deltas) - set(new_quantities)),
+    }
+
+
+@celery_app.task(bind=True)
+def process_stock_adjustment_batch(self, adjustments: List[Dict[str, Any]]):
+    """
+    Apply many stock adjustments in a single transaction.
+    
+    Each adjustment carries item_id, quantity_change, reason and user_id
+    (plus optional reference_number and notes). Adjustments are netted per
+    item; untracked items and items whose stock would go negative at any
+    point in the batch are skipped.
+    """
+    if not adjustments:
+        return {"status": "success", "message": "No adjustments to process"}
+    
+    outcome = asyncio.run(_apply_stock_adjustments(adjustments))
+    if outcome["updated_items"]:
+        invalidate_sync("inventory:*")
+    
+    return {
+        "status": "success",
+        "message": f"Adjusted stock for {len(outcome['updated_items'])} items",
+        **outcome
+    }
+
+
+@celery_app.task(bind=True)
+def process_stock_adjustment(self, adjustment_data: Dict[str, Any]):
+    """Process a single stock adjustment (a batch of one)."""
+    return process_stock_adjustment_batch([adjustment_data])
+
+
+async def _refresh_inventory_value_rollup() -> None:
+    async with task_engine.begin() as conn:
+        await conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY inventory_value_by_category"))
+
+
+@celery_app.task(bind=True)
+def refresh_inventory_value_rollup(self):
+    """Recompute the per-category stock value rollup read by the value report."""
+    asyncio.run(_refresh_inventory_value_rollup())
+    
+    return {"status": "success", "message": "Inventory value rollup refreshed"}
@@ -2,127 +2,319 @@
 Report generation background tasks.
 """
 
-from typing import Dict, Any, List
-from datetime import datetime, timedelta
-from celery import current_task
+import asyncio
+import csv
+import io
+import itertools
+import os
+import time
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Dict, Any, List, Optional
+from datetime import datetime, timedelta, timezone
+from celery import chord, group
+from sqlalchemy import select, func
+from sqlalchemy.exc import OperationalError
 import json
+import orjson
 
 from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.database import task_engine
+from app.models.inventory import InventoryItem, InventoryUpdate, ItemCategory, inventory_value_by_category
+from app.models.supplier import Supplier
 
 
-@celery_app.task(bind=True)
+# Report records; the orjson result serializer encodes dataclasses natively,
+# so they stay compact slotted objects until the result is written
+
+@dataclass(slots=True, frozen=True)
+class LowStockRow:
+    sku: str
+    name: str
+    current_stock: int
+    reorder_point: int
+    supplier: Optional[str]
+
+
+@dataclass(slots=True, frozen=True)
+class ItemValueRow:
+    sku: str
+    name: str
+    value: float
+
+
+@dataclass(slots=True, frozen=True)
+class InventoryValueReport:
+    total_value: float
+    by_category: Dict[str, float]
+    top_items: List[ItemValueRow]
+
+
+@dataclass(slots=True, frozen=True)
+class ItemMovementRow:
+    sku: str
+    name: str
+    movements: int
+
+
+@dataclass(slots=True, frozen=True)
+class MovementReport:
+    period: str
+    total_movements: int
+    inbound: int
+    outbound: int
+    top_moving_items: List[ItemMovementRow]
+
+
+# Per-process sequence so reports started in the same nanosecond still differ
+_report_sequence = itertools.count()
+
+
+def _new_report_id() -> str:
+    """Unique, time-ordered report ID (hex nanosecond timestamp, pid, sequence)."""
+    return f"report_{time.time_ns():x}_{os.getpid():x}_{next(_report_sequence):x}"
+
+
+def _store_report(report_id: str, report_data: Any) -> str:
+    """
+    Write a report to REPORTS_DIR and return its file name.
+    
+    Row reports (lists of records) become CSV, structured reports JSON. The
+    file is written under a temporary name and renamed, so readers never see
+    a partial report.
+    """
+    if isinstance(report_data, list) and all(is_dataclass(row) for row in report_data):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if report_data:
+            columns = [field.name for field in fields(report_data[0])]
+            writer.writerow(columns)
+            writer.writerows([getattr(row, name) for name in columns] for row in report_data)
+        content, file_name = buffer.getvalue().encode(), f"{report_id}.csv"
+    else:
+        content, file_name = orjson.dumps(report_data), f"{report_id}.json"
+    
+    os.makedirs(settings.REPORTS_DIR, exist_ok=True)
+    path = os.path.join(settings.REPORTS_DIR, file_name)
+    with open(f"{path}.tmp", "wb") as f:
+        f.write(content)
+    os.replace(f"{path}.tmp", path)
+    
+    return file_name
+
+
+def _report_result(report_type: str, report_data: Any) -> Dict[str, Any]:
+    """Store a finished report and build the task result pointing at it."""
+    # The result carries only a link; the report itself is downloaded
+    # from the reports endpoint instead of passing through the result backend
+    report_id = _new_report_id()
+    file_name = _store_report(report_id, report_data)
+    
+    return {
+        "status": "success",
+        "message": f"{report_type} report generated successfully",
+        "report_id": report_id,
+        "url": f"{settings.API_V1_STR}/reports/{file_name}"
+    }
+
+
+# Celery records failures itself; only transient database errors are retried
+_RETRY_OPTIONS = {
+    "autoretry_for": (OperationalError, ConnectionError),
+    "retry_backoff": True,
+    "retry_kwargs": {"max_retries": 3},
+}
+
+# Sections of the combined monthly report, in output order
+_MONTHLY_SECTIONS = ("low_stock", "inventory_value", "movement")
+
+
+@celery_app.task(bind=True, throws=(ValueError,), **_RETRY_OPTIONS)
 def generate_inventory_report(self, report_type: str, filters: Dict[str, Any] = None):
-    """Generate inventory reports in the background."""
-    try:
-        current_task.update_state(
-            state="PROGRESS",
-            meta={"message": f"Generating {report_type} report"}
-        )
-        
-        if report_type == "low_stock":
-            report_data = generate_low_stock_report(filters)
-        elif report_type == "inventory_value":
-            report_data = generate_inventory_value_report(filters)
-        elif report_type == "movement":
-            report_data = generate_movement_report(filters)
-        else:
-            raise ValueError(f"Unknown report type: {report_type}")
-        
-        # In a real implementation, you would:
-        # 1. Generate the report data
-        # 2. Create a file (PDF, Excel, CSV)
-        # 3. Store it in a file storage system
-        # 4. Send notification with download link
-        
-        return {
-            "status": "success",
-            "message": f"{report_type} report generated successfully",
-            "report_id": f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            "data": report_data
-        }
-        
-    except Exception as exc:
-        current_task.update_state(
-            state="FAILURE",
-            meta={"error": str(exc)}
-        )
-        raise
+    """
+    Generate inventory reports in the background.
+    
+    The ``monthly`` report runs its sections as separate tasks in a chord, so
+    idle report workers build them in parallel; this task is replaced by the
+    chord and its result is the combined report's.
+    """
+    if report_type == "monthly":
+        header = group(_REPORT_GENERATORS[section].s(filters) for section in _MONTHLY_SECTIONS)
+        raise self.replace(chord(header, _combine_reports.s(report_type)))
+    
+    generator = _REPORT_GENERATORS.get(report_type)
+    if generator is None:
+        raise ValueError(f"Unknown report type: {report_type}")
+    
+    return _report_result(report_type, generator(filters))
+
 
+@celery_app.task
+def _combine_reports(sections: List[Any], report_type: str):
+    """Chord callback: store the section results as one report."""
+    return _report_result(report_type, dict(zip(_MONTHLY_SECTIONS, sections)))
 
-@celery_app.task(bind=True)
+
+def _compact_date(value: datetime) -> str:
+    """YYYYMMDD form of a datetime's date, without going through strftime."""
+    return value.date().isoformat().replace("-", "")
+
+
+@celery_app.task(bind=True, throws=(ValueError,))
 def generate_sales_report(self, start_date: str, end_date: str):
     """Generate sales report for a date range."""
-    try:
-        current_task.update_state(
-            state="PROGRESS",
-            meta={"message": "Generating sales report"}
-        )
-        
-        # Parse dates
-        start = datetime.fromisoformat(start_date)
-        end = datetime.fromisoformat(end_date)
-        
-        # Generate sales report data
-        report_data = {
-            "period": f"{start_date} to {end_date}",
-            "total_orders": 0,
-            "total_revenue": 0.0,
-            "top_items": [],
-            "daily_sales": []
-        }
-        
-        return {
-            "status": "success",
-            "message": "Sales report generated successfully",
-            "report_id": f"sales_report_{start.strftime('%Y%m%d')}_{end.strftime('%Y%m%d')}",
-            "data": report_data
-        }
-        
-    except Exception as exc:
-        current_task.update_state(
-            state="FAILURE",
-            meta={"error": str(exc)}
-        )
-        raise
+    # Parse dates; malformed input fails the task with ValueError
+    start = datetime.fromisoformat(start_date)
+    end = datetime.fromisoformat(end_date)
+    
+    # Generate sales report data
+    report_data = {
+        "period": f"{start_date} to {end_date}",
+        "total_orders": 0,
+        "total_revenue": 0.0,
+        "top_items": [],
+        "daily_sales": []
+    }
+    
+    return {
+        "status": "success",
+        "message": "Sales report generated successfully",
+        "report_id": f"sales_report_{_compact_date(start)}_{_compact_date(end)}",
+        "data": report_data
+    }
 
 
-def generate_low_stock_report(filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-    """Generate low stock items report."""
-    # This would typically query the database
+async def _fetch_rows(stmt) -> List[Any]:
+    """Run one report query on its own connection so several can run under gather()."""
+    async with task_engine.connect() as conn:
+        result = await conn.execute(stmt)
+        return result.all()
+
+
+async def _fetch_low_stock() -> List[LowStockRow]:
+    """Read tracked items at or below their reorder point, by name."""
+    # is_low_stock renders the predicate of the covering partial index
+    # ix_inventory_items_low_stock, so only low-stock rows are read
+    stmt = select(
+        InventoryItem.sku,
+        InventoryItem.name,
+        InventoryItem.quantity_in_stock,
+        InventoryItem.reorder_point,
+        Supplier.name
+    ).outerjoin(
+        Supplier, Supplier.id == InventoryItem.supplier_id
+    ).where(
+        InventoryItem.is_low_stock,
+        InventoryItem.is_tracked.is_(True)
+    ).order_by(InventoryItem.name)
+    
     return [
-        {
-            "sku": "ITEM001",
-            "name": "Sample Item",
-            "current_stock": 5,
-            "reorder_point": 10,
-            "supplier": "ABC Supplier"
-        }
+        LowStockRow(
+            sku=sku,
+            name=name,
+            current_stock=current_stock,
+            reorder_point=reorder_point,
+            supplier=supplier
+        )
+        for sku, name, current_stock, reorder_point, supplier in await _fetch_rows(stmt)
     ]
 
 
-def generate_inventory_value_report(filters: Dict[str, Any] = None) -> Dict[str, Any]:
-    """Generate inventory value report."""
-    return {
-        "total_value": 50000.0,
-        "by_category": {
-            "electronics": 25000.0,
-            "clothing": 15000.0,
-            "books": 10000.0
-        },
-        "top_items": [
-            {"sku": "ITEM001", "name": "Sample Item", "value": 5000.0}
+@celery_app.task(**_RETRY_OPTIONS)
+def generate_low_stock_report(filters: Dict[str, Any] = None) -> List[LowStockRow]:
+    """Generate low stock items report."""
+    return asyncio.run(_fetch_low_stock())
+
+
+# Stock valued at cost, falling back to the sale price when no cost is recorded
+_ITEM_VALUE = InventoryItem.quantity_in_stock * func.coalesce(InventoryItem.cost_price, InventoryItem.unit_price)
+
+
+async def _fetch_inventory_value(filters: Dict[str, Any]) -> InventoryValueReport:
+    """Run the value aggregations concurrently, each on its own connection."""
+    conditions = []
+    rollup_conditions = []
+    if filters.get("category"):
+        category = ItemCategory(filters["category"])
+        conditions.append(InventoryItem.category == category)
+        rollup_conditions.append(inventory_value_by_category.c.category == category)
+    
+    # Category totals come from the precomputed rollup (refreshed every 15
+    # minutes) instead of aggregating the whole items table per report
+    by_category_stmt = select(
+        inventory_value_by_category.c.category,
+        inventory_value_by_category.c.value
+    ).where(*rollup_conditions)
+    item_value = _ITEM_VALUE.label("value")
+    top_items_stmt = select(
+        InventoryItem.sku,
+        InventoryItem.name,
+        item_value
+    ).where(*conditions).order_by(item_value.desc()).limit(10)
+    
+    by_category, top_items = await asyncio.gather(_fetch_rows(by_category_stmt), _fetch_rows(top_items_stmt))
+    
+    category_values = {category.value: float(value or 0) for category, value in by_category}
+    return InventoryValueReport(
+        total_value=sum(category_values.values()),
+        by_category=category_values,
+        top_items=[
+            ItemValueRow(sku=sku, name=name, value=float(value))
+            for sku, name, value in top_items
         ]
-    }
+    )
 
 
-def generate_movement_report(filters: Dict[str, Any] = None) -> Dict[str, Any]:
-    """Generate inventory movement report."""
-    return {
-        "period": "Last 30 days",
-        "total_movements": 150,
-        "inbound": 75,
-        "outbound": 75,
-        "top_moving_items": [
-            {"sku": "ITEM001", "name": "Sample Item", "movements": 25}
+@celery_app.task(**_RETRY_OPTIONS)
+def generate_inventory_value_report(filters: Dict[str, Any] = None) -> InventoryValueReport:
+    """Generate inventory value report, optionally limited to one category."""
+    return asyncio.run(_fetch_inventory_value(filters or {}))
+
+
+async def _fetch_movements(days: int) -> MovementReport:
+    """Count stock movements in the window with SQL aggregates, run concurrently."""
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    in_window = InventoryUpdate.created_at >= since
+    
+    totals_stmt = select(
+        func.count(),
+        func.count().filter(InventoryUpdate.quantity_change > 0),
+        func.count().filter(InventoryUpdate.quantity_change < 0)
+    ).where(in_window)
+    movements = func.count().label("movements")
+    top_items_stmt = select(
+        InventoryItem.sku,
+        InventoryItem.name,
+        movements
+    ).join(
+        InventoryUpdate, InventoryUpdate.item_id == InventoryItem.id
+    ).where(in_window).group_by(InventoryItem.id).order_by(movements.desc()).limit(10)
+    
+    totals, top_items = await asyncio.gather(_fetch_rows(totals_stmt), _fetch_rows(top_items_stmt))
+    
+    total, inbound, outbound = totals[0]
+    return MovementReport(
+        period=f"Last {days} days",
+        total_movements=total,
+        inbound=inbound,
+        outbound=outbound,
+        top_moving_items=[
+            ItemMovementRow(sku=sku, name=name, movements=count)
+            for sku, name, count in top_items
         ]
-    }
+    )
+
+
+@celery_app.task(**_RETRY_OPTIONS)
+def generate_movement_report(filters: Dict[str, Any] = None) -> MovementReport:
+    """Generate inventory movement report over the last ``days`` (default 30)."""
+    days = int((filters or {}).get("days", 30))
+    return asyncio.run(_fetch_movements(days))
+
+
+# Report type -> generator used by generate_inventory_report
+_REPORT_GENERATORS = {
+    "low_stock": generate_low_stock_report,
+    "inventory_value": generate_inventory_value_report,
+    "movement": generate_movement_report,
+}
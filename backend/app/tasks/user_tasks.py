@@ -0,0 +1,53 @@
+"""
+User-related background tasks.
+"""
+
+import asyncio
+from typing import Dict, Any
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.core.cache import invalidate_sync
+from app.core.celery_app import celery_app
+from app.core.database import task_engine, violated_constraint
+from app.core.security import get_password_hash
+from app.models.user import User, USER_UNIQUE_FIELDS
+from app.schemas.user import UserCreate
+
+
+async def _insert_user(values: Dict[str, Any]) -> int:
+    async with task_engine.begin() as conn:
+        result = await conn.execute(insert(User).values(**values).returning(User.id))
+        return result.scalar_one()
+
+
+@celery_app.task(bind=True)
+def create_user_task(self, user_data: Dict[str, Any]):
+    """Hash the password and create a user outside the request cycle.
+
+    The payload carries the plaintext password, so the broker must be a
+    private, trusted service (as the Redis instance in docker-compose is).
+    """
+    user = UserCreate(**user_data)
+    values = user.dict(exclude={"password"})
+    values["hashed_password"] = get_password_hash(user.password)
+
+    try:
+        user_id = asyncio.run(_insert_user(values))
+    except IntegrityError as exc:
+        field = USER_UNIQUE_FIELDS.get(violated_constraint(exc))
+        if field is None:
+            raise
+        return {
+            "status": "error",
+            "message": f"{field} already exists"
+        }
+
+    invalidate_sync("user:*")
+
+    return {
+        "status": "success",
+        "message": "User created successfully",
+        "user_id": user_id
+    }
@@ -6,6 +6,7 @@ import pytest
 import asyncio
 from typing import AsyncGenerator
 from httpx import AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import StaticPool
 
@@ -14,7 +15,9 @@ from app.core.database import get_db, Base
 from app.core.config import settings
 
 
-# Test database URL
+# Test database URL. PostgreSQL-only DDL (the order number default, the
+# materialized view) is skipped on SQLite, so tests inserting orders must
+# set order_number themselves
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
 # Create test engine
@@ -52,16 +55,22 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
         await conn.run_sync(Base.metadata.drop_all)
 
 
+@pytest.fixture(scope="session")
+async def http_client() -> AsyncGenerator[AsyncClient, None]:
+    """One HTTP client for the whole test session."""
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        yield ac
+
+
 @pytest.fixture
-async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
-    """Create a test client with database session override."""
+async def client(http_client: AsyncClient, db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
+    """Shared test client with this test's database session override."""
     def override_get_db():
         return db_session
     
     app.dependency_overrides[get_db] = override_get_db
     
-    async with AsyncClient(app=app, base_url="http://test") as ac:
-        yield ac
+    yield http_client
     
     app.dependency_overrides.clear()
 
@@ -98,3 +107,16 @@ async def auth_headers(client: AsyncClient, test_user):
     
     token = response.json()["access_token"]
     return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def query_log():
+    """Record every SQL statement sent to the test database."""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(test_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(test_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
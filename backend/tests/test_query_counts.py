@@ -0,0 +1,114 @@
+"""
+Tests guarding endpoints against N+1 query regressions.
+"""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@pytest.fixture
+async def admin_headers(client: AsyncClient, db_session: AsyncSession):
+    """Create an admin user and return its authentication headers."""
+    from app.models.user import User, UserRole
+    from app.core.security import get_password_hash
+    
+    for i in range(3):
+        db_session.add(User(
+            username=f"user{i}",
+            email=f"user{i}@example.com",
+            full_name=f"User {i}",
+            hashed_password="unused",
+        ))
+    db_session.add(User(
+        username="admin",
+        email="admin@example.com",
+        full_name="Admin User",
+        role=UserRole.ADMIN,
+        hashed_password=get_password_hash("adminpassword"),
+    ))
+    await db_session.commit()
+    
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"username": "admin", "password": "adminpassword"}
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+async def orders(db_session: AsyncSession, admin_headers):
+    """Create three orders with two items each, owned by the admin user."""
+    from decimal import Decimal
+    from sqlalchemy import select
+    from app.models.inventory import InventoryItem, ItemCategory
+    from app.models.order import Order, OrderItem, OrderType
+    from app.models.user import User
+    
+    admin_id = (await db_session.execute(select(User.id).where(User.username == "admin"))).scalar_one()
+    items = [
+        InventoryItem(sku=f"SKU-{i}", name=f"Item {i}", category=ItemCategory.TOOLS, unit_price=Decimal("5.00"))
+        for i in range(2)
+    ]
+    db_session.add_all(items)
+    await db_session.flush()
+    
+    for i in range(3):
+        # order_number has no default on SQLite (see conftest)
+        db_session.add(Order(
+            order_number=f"ORD-TEST-{i}",
+            order_type=OrderType.PURCHASE,
+            user_id=admin_id,
+            order_items=[
+                OrderItem(item_id=item.id, quantity=2, unit_price=Decimal("5.00"), total_price=Decimal("10.00"))
+                for item in items
+            ],
+        ))
+    await db_session.commit()
+    
+    # Start the request from an empty identity map so loads are counted
+    db_session.expunge_all()
+
+
+class TestQueryCounts:
+    """Test that read endpoints issue a constant number of queries."""
+    
+    async def test_user_list_is_single_query(self, client: AsyncClient, admin_headers, query_log):
+        """Test that listing users costs one query regardless of row count."""
+        query_log.clear()
+        response = await client.get("/api/v1/users/", headers=admin_headers)
+        
+        assert response.status_code == 200
+        assert len(response.json()["users"]) == 4
+        assert len(query_log) == 1
+    
+    async def test_user_detail_is_single_query(self, client: AsyncClient, admin_headers, query_log):
+        """Test that fetching a user by ID costs one query."""
+        query_log.clear()
+        response = await client.get("/api/v1/users/1", headers=admin_headers)
+        
+        assert response.status_code == 200
+        # db.get() may be answered from the session's identity map
+        assert len(query_log) <= 1
+    
+    async def test_order_list_is_single_query(self, client: AsyncClient, admin_headers, orders, query_log):
+        """Test that listing orders costs one query and loads no relationships."""
+        query_log.clear()
+        response = await client.get("/api/v1/orders/", headers=admin_headers)
+        
+        assert response.status_code == 200
+        assert len(response.json()["orders"]) == 3
+        assert len(query_log) == 1
+    
+    async def test_order_detail_loads_items_in_one_query(self, client: AsyncClient, admin_headers, orders, query_log):
+        """Test that an order and its items cost two queries.
+        
+        The route loads with raiseload("*"), so any relationship read outside
+        the planned selectin load raises instead of adding a query.
+        """
+        query_log.clear()
+        response = await client.get("/api/v1/orders/1", headers=admin_headers)
+        
+        assert response.status_code == 200
+        assert len(response.json()["order_items"]) == 2
+        assert len(query_log) == 2
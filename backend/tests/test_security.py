@@ -0,0 +1,69 @@
+"""
+Tests for security utilities.
+"""
+
+import bcrypt
+
+from app.core import security
+from app.core.security import (
+    create_access_token,
+    get_password_hash,
+    verify_and_update_password,
+    verify_token,
+)
+
+
+class TestTokenCache:
+    """Test caching of verified JWT claims."""
+
+    def setup_method(self):
+        security._token_cache.clear()
+
+    def test_verified_token_is_cached(self):
+        """Test that a successfully verified token is cached."""
+        token = create_access_token({"sub": "testuser", "user_id": 1, "role": "staff"})
+
+        assert verify_token(token) is not None
+        assert len(security._token_cache) == 1
+
+        token_data = verify_token(token)
+        assert token_data.username == "testuser"
+        assert token_data.user_id == 1
+
+    def test_invalid_token_is_not_cached(self):
+        """Test that failed verifications are never cached."""
+        assert verify_token("not-a-jwt") is None
+        assert len(security._token_cache) == 0
+
+    def test_cached_token_still_checks_type(self):
+        """Test that a cached access token is rejected as a refresh token."""
+        token = create_access_token({"sub": "testuser", "user_id": 1, "role": "staff"})
+
+        assert verify_token(token) is not None
+        assert verify_token(token, "refresh") is None
+
+
+class TestPasswordHashing:
+    """Test password hashing scheme migration."""
+
+    def test_new_hashes_use_argon2(self):
+        """Test that new password hashes use Argon2id."""
+        assert get_password_hash("testpassword").startswith("$argon2id$")
+
+    async def test_bcrypt_hash_verifies_and_is_upgraded(self):
+        """Test that legacy bcrypt hashes still verify and get replaced."""
+        legacy_hash = bcrypt.hashpw(b"testpassword", bcrypt.gensalt(rounds=4)).decode()
+
+        valid, new_hash = await verify_and_update_password("testpassword", legacy_hash)
+
+        assert valid
+        assert new_hash.startswith("$argon2id$")
+
+    async def test_current_hash_is_not_upgraded(self):
+        """Test that up-to-date hashes are left alone."""
+        valid, new_hash = await verify_and_update_password(
+            "testpassword", get_password_hash("testpassword")
+        )
+
+        assert valid
+        assert new_hash is None